@@ -9,36 +9,146 @@ Audio buffer module optimized with Cython for high-performance streaming
 
 from libc.stdlib cimport malloc, free
 from libc.string cimport memcpy
-from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AsString, PyBytes_Size
+from libc.stdint cimport uint32_t
+from cpython.bytes cimport PyBytes_FromStringAndSize, PyBytes_AS_STRING
 cimport cython
 
+cdef extern from *:
+    """
+    #define CYCAST_LOAD_ACQUIRE(p) __atomic_load_n((p), __ATOMIC_ACQUIRE)
+    #define CYCAST_STORE_RELEASE(p, v) __atomic_store_n((p), (v), __ATOMIC_RELEASE)
+    """
+    Py_ssize_t load_acquire "CYCAST_LOAD_ACQUIRE" (Py_ssize_t* ptr) nogil
+    void store_release "CYCAST_STORE_RELEASE" (Py_ssize_t* ptr, Py_ssize_t value) nogil
+
+cdef extern from *:
+    """
+    #include <stdint.h>
+    #ifdef __linux__
+    #include <linux/futex.h>
+    #include <sys/syscall.h>
+    #include <unistd.h>
+    #else
+    #include <sched.h>
+    #endif
+
+    /* Lock word states: 0 = unlocked, 1 = locked, 2 = locked with waiters */
+    static inline int cycast_lock_try(uint32_t* word) {
+        uint32_t expected = 0;
+        return __atomic_compare_exchange_n(word, &expected, 1, 0,
+                                           __ATOMIC_ACQUIRE, __ATOMIC_RELAXED);
+    }
+
+    static void cycast_lock_wait(uint32_t* word) {
+        while (__atomic_exchange_n(word, 2, __ATOMIC_ACQUIRE) != 0) {
+    #ifdef __linux__
+            syscall(SYS_futex, word, FUTEX_WAIT_PRIVATE, 2, NULL, NULL, 0);
+    #else
+            sched_yield();
+    #endif
+        }
+    }
+
+    static inline void cycast_lock_release(uint32_t* word) {
+        if (__atomic_exchange_n(word, 0, __ATOMIC_RELEASE) == 2) {
+    #ifdef __linux__
+            syscall(SYS_futex, word, FUTEX_WAKE_PRIVATE, 1, NULL, NULL, 0);
+    #endif
+        }
+    }
+    """
+    bint cycast_lock_try(uint32_t* word) nogil
+    void cycast_lock_wait(uint32_t* word) nogil
+    void cycast_lock_release(uint32_t* word) nogil
+
+cdef class FastLock:
+    """
+    Minimal non-reentrant mutex backed by a single lock word
+    Uncontended acquire/release is one atomic instruction each; contended
+    waiters sleep on a futex (Linux) with the GIL released.
+    """
+    cdef uint32_t state
+    
+    cdef inline void _acquire(self):
+        if not cycast_lock_try(&self.state):
+            with nogil:
+                cycast_lock_wait(&self.state)
+    
+    cdef inline void _release(self):
+        cycast_lock_release(&self.state)
+    
+    def acquire(self, bint blocking=True):
+        """Acquire the lock, returns True if it was acquired"""
+        if cycast_lock_try(&self.state):
+            return True
+        if not blocking:
+            return False
+        with nogil:
+            cycast_lock_wait(&self.state)
+        return True
+    
+    def release(self):
+        """Release the lock"""
+        if self.state == 0:
+            raise RuntimeError("release unlocked lock")
+        self._release()
+    
+    def locked(self):
+        """Return True if the lock is held"""
+        return self.state != 0
+    
+    def __enter__(self):
+        self._acquire()
+        return True
+    
+    def __exit__(self, *exc_info):
+        self._release()
+
 cdef class CircularAudioBuffer:
     """
     High-performance circular buffer for audio streaming
     Uses Cython for zero-copy operations where possible
+    
+    Single-consumer ring: write_pos and read_pos are running byte totals,
+    each advanced by only one side and published with release stores, so
+    the broadcaster never takes a lock. Writers are serialized among
+    themselves because a live source can briefly overlap the playlist.
+    Blocking writers wait on not_full, which the reader signals only when
+    someone is actually waiting; likewise the reader waits on not_empty for
+    data_wanted bytes instead of polling available().
     """
     cdef:
-        char* buffer
+        unsigned char* buffer
         Py_ssize_t buffer_size
+        FastLock write_lock
+        object not_full
+        int writers_waiting
+        object not_empty
+        Py_ssize_t data_wanted
+        # Keep the producer and consumer indices on separate cache lines
+        char _pad_producer[64]
         Py_ssize_t write_pos
+        char _pad_consumer[64]
         Py_ssize_t read_pos
-        Py_ssize_t data_available
-        object lock
+        char _pad_tail[64]
     
     def __cinit__(self, int size_mb=10):
         """Initialize the circular buffer"""
         self.buffer_size = size_mb * 1024 * 1024
-        self.buffer = <char*>malloc(self.buffer_size)
+        self.buffer = <unsigned char*>malloc(self.buffer_size)
         if not self.buffer:
             raise MemoryError("Failed to allocate audio buffer")
         
         self.write_pos = 0
         self.read_pos = 0
-        self.data_available = 0
     
     def __init__(self, int size_mb=10):
         import threading
-        self.lock = threading.RLock()
+        self.write_lock = FastLock()
+        self.not_full = threading.Condition()
+        self.writers_waiting = 0
+        self.not_empty = threading.Condition()
+        self.data_wanted = 0
     
     def __dealloc__(self):
         """Clean up allocated memory"""
@@ -47,40 +157,92 @@ cdef class CircularAudioBuffer:
     
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cpdef bint write(self, bytes data):
+    cpdef bint write(self, const unsigned char[::1] data, bint block=False):
         """
         Write data to the buffer
+        Accepts any contiguous buffer (bytes, bytearray, memoryview, mmap)
+        without copying it into an intermediate bytes object.
         Returns True if successful, False if buffer is full
+        With block=True, waits for the reader to free enough space instead
         """
         cdef:
-            Py_ssize_t data_len = PyBytes_Size(data)
-            char* data_ptr = PyBytes_AsString(data)
-            Py_ssize_t space_available
+            Py_ssize_t data_len = data.shape[0]
+        
+        if data_len == 0:
+            return True
+        
+        while not self._try_write(&data[0], data_len):
+            if not block or data_len > self.buffer_size:
+                return False
+            self._wait_for_space(data_len)
+        
+        if self.data_wanted and self.available() >= self.data_wanted:
+            self._notify_not_empty()
+        return True
+    
+    cdef bint _try_write(self, const unsigned char* data_ptr, Py_ssize_t data_len):
+        """Copy data in if it fits, returns False without waiting otherwise"""
+        cdef:
+            Py_ssize_t write_pos
+            Py_ssize_t offset
             Py_ssize_t first_chunk
-            Py_ssize_t second_chunk
         
-        with self.lock:
-            space_available = self.buffer_size - self.data_available
-            
-            if data_len > space_available:
+        self.write_lock._acquire()
+        try:
+            write_pos = self.write_pos
+            if data_len > self.buffer_size - (write_pos - load_acquire(&self.read_pos)):
                 return False
             
-            # Handle wrap-around
-            if self.write_pos + data_len > self.buffer_size:
-                first_chunk = self.buffer_size - self.write_pos
-                second_chunk = data_len - first_chunk
+            offset = write_pos % self.buffer_size
+            first_chunk = min(data_len, self.buffer_size - offset)
+            
+            with nogil:
+                # Handle wrap-around
+                memcpy(self.buffer + offset, data_ptr, first_chunk)
+                if data_len > first_chunk:
+                    memcpy(self.buffer, data_ptr + first_chunk, data_len - first_chunk)
                 
-                memcpy(self.buffer + self.write_pos, data_ptr, first_chunk)
-                memcpy(self.buffer, data_ptr + first_chunk, second_chunk)
-                self.write_pos = second_chunk
-            else:
-                memcpy(self.buffer + self.write_pos, data_ptr, data_len)
-                self.write_pos += data_len
-                if self.write_pos >= self.buffer_size:
-                    self.write_pos = 0
+                # Publish the bytes to the reader only after they are copied
+                store_release(&self.write_pos, write_pos + data_len)
             
-            self.data_available += data_len
             return True
+        finally:
+            self.write_lock._release()
+    
+    cdef void _wait_for_space(self, Py_ssize_t data_len):
+        """Block until at least data_len bytes are free"""
+        with self.not_full:
+            self.writers_waiting += 1
+            try:
+                while self.space() < data_len:
+                    self.not_full.wait()
+            finally:
+                self.writers_waiting -= 1
+    
+    cdef void _notify_not_full(self):
+        """Wake writers blocked in write(block=True)"""
+        with self.not_full:
+            self.not_full.notify_all()
+    
+    cdef void _notify_not_empty(self):
+        """Wake a reader blocked in wait_for_data()"""
+        with self.not_empty:
+            self.not_empty.notify_all()
+    
+    def wait_for_data(self, Py_ssize_t size, timeout=None):
+        """
+        Block until at least size bytes are available to read
+        Returns False if the timeout expired first
+        """
+        if self.available() >= size:
+            return True
+        with self.not_empty:
+            # Writers only signal once this much is readable
+            self.data_wanted = size
+            try:
+                return self.not_empty.wait_for(lambda: self.available() >= size, timeout)
+            finally:
+                self.data_wanted = 0
     
     @cython.boundscheck(False)
     @cython.wraparound(False)
@@ -91,58 +253,48 @@ cdef class CircularAudioBuffer:
         """
         cdef:
             bytes result
-            char* temp_buffer
+            char* result_ptr
+            Py_ssize_t read_pos = self.read_pos
+            Py_ssize_t offset
             Py_ssize_t first_chunk
-            Py_ssize_t second_chunk
         
-        with self.lock:
-            if size > self.data_available:
-                return b''
-            
+        if size <= 0 or size > load_acquire(&self.write_pos) - read_pos:
+            return b''
+        
+        # Copy straight into the result object's storage
+        result = PyBytes_FromStringAndSize(NULL, size)
+        result_ptr = PyBytes_AS_STRING(result)
+        
+        offset = read_pos % self.buffer_size
+        first_chunk = min(size, self.buffer_size - offset)
+        
+        with nogil:
             # Handle wrap-around
-            if self.read_pos + size > self.buffer_size:
-                first_chunk = self.buffer_size - self.read_pos
-                second_chunk = size - first_chunk
-                
-                # Allocate temporary buffer for combining chunks
-                temp_buffer = <char*>malloc(size)
-                if not temp_buffer:
-                    return b''
-                
-                memcpy(temp_buffer, self.buffer + self.read_pos, first_chunk)
-                memcpy(temp_buffer + first_chunk, self.buffer, second_chunk)
-                
-                result = PyBytes_FromStringAndSize(temp_buffer, size)
-                free(temp_buffer)
-                
-                self.read_pos = second_chunk
-            else:
-                result = PyBytes_FromStringAndSize(self.buffer + self.read_pos, size)
-                self.read_pos += size
-                if self.read_pos >= self.buffer_size:
-                    self.read_pos = 0
+            memcpy(result_ptr, self.buffer + offset, first_chunk)
+            if size > first_chunk:
+                memcpy(result_ptr + first_chunk, self.buffer, size - first_chunk)
             
-            self.data_available -= size
-            return result
+            # Hand the region back to the writer only after it is copied out
+            store_release(&self.read_pos, read_pos + size)
+        
+        if self.writers_waiting:
+            self._notify_not_full()
+        return result
     
     cpdef Py_ssize_t available(self):
         """Return the amount of data available to read"""
-        with self.lock:
-            return self.data_available
+        return load_acquire(&self.write_pos) - load_acquire(&self.read_pos)
     
     cpdef Py_ssize_t space(self):
         """Return the amount of space available for writing"""
-        with self.lock:
-            return self.buffer_size - self.data_available
+        return self.buffer_size - self.available()
     
     cpdef void clear(self):
-        """Clear the buffer"""
-        with self.lock:
-            self.write_pos = 0
-            self.read_pos = 0
-            self.data_available = 0
+        """Clear the buffer (discards unread data; call from the reader side)"""
+        store_release(&self.read_pos, load_acquire(&self.write_pos))
+        if self.writers_waiting:
+            self._notify_not_full()
     
     cpdef float fill_percentage(self):
         """Return buffer fill percentage (0.0 to 1.0)"""
-        with self.lock:
-            return <float>self.data_available / <float>self.buffer_size
+        return <float>self.available() / <float>self.buffer_size
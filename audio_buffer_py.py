@@ -8,69 +8,137 @@ import threading
 
 
 class CircularAudioBuffer:
-    """Circular buffer for audio data - pure Python version"""
+    """Circular buffer for audio data - pure Python version
+    
+    write_pos and read_pos are running byte totals, each advanced by only
+    one side, so the reader never takes a lock. Writers are serialized
+    among themselves because a live source can briefly overlap the playlist.
+    Blocking writers wait on not_full, which the reader signals only when
+    someone is actually waiting; likewise the reader waits on not_empty for
+    data_wanted bytes instead of polling available().
+    """
     
     def __init__(self, size_mb=10):
         self.size = size_mb * 1024 * 1024
         self.buffer = bytearray(self.size)
+        # Slicing a view doesn't copy, so reads and writes copy each byte once
+        self.view = memoryview(self.buffer)
         self.write_pos = 0
         self.read_pos = 0
-        self.available_bytes = 0
-        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.not_full = threading.Condition()
+        self.writers_waiting = 0
+        self.not_empty = threading.Condition()
+        self.data_wanted = 0
     
-    def write(self, data):
-        """Write data to buffer, returns True if successful"""
-        with self.lock:
-            data_len = len(data)
+    def write(self, data, block=False):
+        """Write data to buffer, returns True if successful
+        
+        With block=True, waits for the reader to free enough space instead
+        of failing when the buffer is full.
+        """
+        data_len = len(data)
+        
+        while True:
+            with self.write_lock:
+                write_pos = self.write_pos
+                
+                # Check if there's space
+                if data_len <= self.size - (write_pos - self.read_pos):
+                    # Write data as at most two slice copies (may wrap around)
+                    offset = write_pos % self.size
+                    first = min(data_len, self.size - offset)
+                    with memoryview(data) as src:
+                        self.view[offset:offset + first] = src[:first]
+                        if data_len > first:
+                            self.view[0:data_len - first] = src[first:]
+                    
+                    # Publish the bytes to the reader only after they are copied
+                    self.write_pos = write_pos + data_len
+                    break
             
-            # Check if there's space
-            if self.available_bytes + data_len > self.size:
+            if not block or data_len > self.size:
                 return False
             
-            # Write data (may wrap around)
-            for byte in data:
-                self.buffer[self.write_pos] = byte
-                self.write_pos = (self.write_pos + 1) % self.size
-            
-            self.available_bytes += data_len
+            self._wait_for_space(data_len)
+        
+        if self.data_wanted and self.available() >= self.data_wanted:
+            self._notify_not_empty()
+        return True
+    
+    def _wait_for_space(self, data_len):
+        """Block until at least data_len bytes are free"""
+        with self.not_full:
+            self.writers_waiting += 1
+            try:
+                while self.space() < data_len:
+                    self.not_full.wait()
+            finally:
+                self.writers_waiting -= 1
+    
+    def _notify_not_full(self):
+        """Wake writers blocked in write(block=True)"""
+        with self.not_full:
+            self.not_full.notify_all()
+    
+    def _notify_not_empty(self):
+        """Wake a reader blocked in wait_for_data()"""
+        with self.not_empty:
+            self.not_empty.notify_all()
+    
+    def wait_for_data(self, size, timeout=None):
+        """Block until at least size bytes are available to read
+        
+        Returns False if the timeout expired first.
+        """
+        if self.available() >= size:
             return True
+        with self.not_empty:
+            # Writers only signal once this much is readable
+            self.data_wanted = size
+            try:
+                return self.not_empty.wait_for(lambda: self.available() >= size, timeout)
+            finally:
+                self.data_wanted = 0
     
     def read(self, size):
         """Read up to size bytes from buffer"""
-        with self.lock:
-            # Can't read more than available
-            to_read = min(size, self.available_bytes)
-            
-            if to_read == 0:
-                return b''
-            
-            # Read data (may wrap around)
-            data = bytearray(to_read)
-            for i in range(to_read):
-                data[i] = self.buffer[self.read_pos]
-                self.read_pos = (self.read_pos + 1) % self.size
-            
-            self.available_bytes -= to_read
-            return bytes(data)
+        read_pos = self.read_pos
+        
+        # Can't read more than available
+        to_read = min(size, self.write_pos - read_pos)
+        
+        if to_read <= 0:
+            return b''
+        
+        # Copy straight from the ring into the result (may wrap around)
+        offset = read_pos % self.size
+        first = min(to_read, self.size - offset)
+        if to_read > first:
+            data = b''.join((self.view[offset:offset + first], self.view[0:to_read - first]))
+        else:
+            data = self.view[offset:offset + to_read].tobytes()
+        
+        # Hand the region back to the writer only after it is copied out
+        self.read_pos = read_pos + to_read
+        if self.writers_waiting:
+            self._notify_not_full()
+        return data
     
     def available(self):
         """Return number of bytes available to read"""
-        with self.lock:
-            return self.available_bytes
+        return self.write_pos - self.read_pos
     
     def space(self):
         """Return number of bytes available to write"""
-        with self.lock:
-            return self.size - self.available_bytes
+        return self.size - self.available()
     
     def clear(self):
-        """Clear all data from buffer"""
-        with self.lock:
-            self.write_pos = 0
-            self.read_pos = 0
-            self.available_bytes = 0
+        """Clear all data from buffer (call from the reader side)"""
+        self.read_pos = self.write_pos
+        if self.writers_waiting:
+            self._notify_not_full()
     
     def fill_percentage(self):
         """Return buffer fill percentage (0.0 to 1.0)"""
-        with self.lock:
-            return self.available_bytes / self.size
+        return self.available() / self.size
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Byte-scanning helpers for the audio path
+Compiled with Numba when it is installed, plain Python otherwise
+"""
+
+try:
+    import numpy as np
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+STREAM_TITLE_PREFIX = b"StreamTitle='"
+STREAM_TITLE_SUFFIX = b"';"
+
+# ICY metadata blocks are at most 255 * 16 bytes
+ICY_TITLE_MAX = 4080
+
+
+def _id3_size(b):
+    """Decode a 4-byte ID3v2 synchsafe integer (7 bits per byte)"""
+    return ((b[0] & 0x7f) << 21) | ((b[1] & 0x7f) << 14) | \
+           ((b[2] & 0x7f) << 7) | (b[3] & 0x7f)
+
+
+def _scan_needle(buf, n, needle, state):
+    """Advance a match of needle over buf[:n] starting with state bytes matched
+    
+    Returns (end, 0) with end just past the needle once it completes, or
+    (-1, state) with the number of needle bytes matched at the end of buf.
+    Resetting on a mismatch is exact because needle[0] does not recur.
+    """
+    m = len(needle)
+    for i in range(n):
+        c = buf[i]
+        if c == needle[state]:
+            state += 1
+        elif c == needle[0]:
+            state = 1
+        else:
+            state = 0
+        if state == m:
+            return i + 1, 0
+    return -1, state
+
+
+if HAVE_NUMBA:
+    _id3_size = njit(cache=True)(_id3_size)
+    _scan_needle = njit(cache=True)(_scan_needle)
+
+    _PREFIX = np.frombuffer(STREAM_TITLE_PREFIX, dtype=np.uint8)
+
+    def parse_id3_size(header):
+        """Decode the synchsafe size field (header bytes 6-10) of an ID3v2 tag"""
+        return int(_id3_size(np.frombuffer(header, dtype=np.uint8)))
+
+    def scan_icy(buf, n, state):
+        """Scan buf[:n] for StreamTitle=' continuing from a previous chunk
+        
+        Returns (end, state) as described in _scan_needle.
+        """
+        end, state = _scan_needle(np.frombuffer(buf, dtype=np.uint8), n, _PREFIX, state)
+        return int(end), int(state)
+else:
+    def parse_id3_size(header):
+        """Decode the synchsafe size field (header bytes 6-10) of an ID3v2 tag"""
+        # One big-endian read, then fold out the high bit of each byte
+        raw = int.from_bytes(header, 'big')
+        return ((raw & 0x7f000000) >> 3) | ((raw & 0x7f0000) >> 2) | \
+               ((raw & 0x7f00) >> 1) | (raw & 0x7f)
+
+    def scan_icy(buf, n, state):
+        """Scan buf[:n] for StreamTitle=' continuing from a previous chunk
+        
+        Returns (end, state) as described in _scan_needle.
+        """
+        needle = STREAM_TITLE_PREFIX
+        m = len(needle)
+        
+        # Finish a match left open by the previous chunk
+        if state:
+            rest = needle[state:]
+            if n < len(rest):
+                if buf.startswith(rest[:n], 0, n):
+                    return -1, state + n
+            elif buf.startswith(rest, 0, n):
+                return len(rest), 0
+        
+        pos = buf.find(needle, 0, n)
+        if pos >= 0:
+            return pos + m, 0
+        
+        # Longest tail of this chunk that could start the next match
+        for k in range(min(m - 1, n), 0, -1):
+            if buf.startswith(needle[:k], n - k, n):
+                return -1, k
+        return -1, 0
+
+
+class IcyTitleScanner:
+    """Extracts StreamTitle values from a source stream chunk by chunk
+    
+    Keeps match state between chunks, so a title split across two recv()
+    calls is still found and each byte is scanned only once.
+    """
+    
+    def __init__(self):
+        self.state = 0
+        self.title = None
+    
+    def feed(self, buf, n):
+        """Scan buf[:n], returns the raw title once one is complete
+        
+        The title comes back as a memoryview over the scanner's own
+        collection buffer, which is handed over rather than copied again.
+        """
+        pos = 0
+        if self.title is None:
+            end, self.state = scan_icy(buf, n, self.state)
+            if end < 0:
+                return None
+            self.title = bytearray()
+            pos = end
+        
+        # Collect title bytes until the closing ';
+        searched = max(0, len(self.title) - 1)
+        with memoryview(buf) as view:
+            self.title += view[pos:n]
+        close = self.title.find(STREAM_TITLE_SUFFIX, searched)
+        if close >= 0:
+            title = memoryview(self.title)[:close]
+            self.title = None
+            return title
+        if len(self.title) > ICY_TITLE_MAX:
+            self.title = None
+        return None
+
+
+def warmup():
+    """Compile the kernels up front so the first real call isn't slowed down"""
+    parse_id3_size(b'\x00\x00\x00\x00')
+    scan_icy(bytearray(STREAM_TITLE_PREFIX), len(STREAM_TITLE_PREFIX), 0)
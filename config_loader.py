@@ -5,6 +5,8 @@ Loads and validates HCL configuration files using pyhcl
 """
 
 import os
+import json
+import stat
 import hcl
 import logging
 from typing import Dict, Any
@@ -60,61 +62,117 @@ class Config:
         """Load configuration from HCL file"""
         self.config_file = config_file
         self.data = self._load_config()
+        
+        # One hash lookup per get() instead of two
+        self._flat = {
+            (section, key): value
+            for section, values in self.data.items()
+            if isinstance(values, dict)
+            for key, value in values.items()
+        }
     
-    def _merge_config(self, base: Dict, override: Dict) -> Dict:
-        """Deep merge two configuration dictionaries"""
-        result = base.copy()
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_config(result[key], value)
-            else:
-                result[key] = value
-        return result
+    def _merge_config(self, parsed: Dict) -> Dict:
+        """Overlay parsed sections on the defaults (sections are one level deep)"""
+        merged = {
+            section: {**defaults, **parsed.get(section, {})}
+            for section, defaults in self.DEFAULT_CONFIG.items()
+        }
+        for section, values in parsed.items():
+            merged.setdefault(section, values)
+        return merged
     
     def _load_config(self) -> Dict[str, Any]:
         """Load and parse HCL configuration file"""
         if not os.path.exists(self.config_file):
             logger.warning(f"Config file {self.config_file} not found, using defaults")
-            return self.DEFAULT_CONFIG.copy()
+            return self._merge_config({})
         
         try:
-            with open(self.config_file, 'r') as f:
-                parsed = hcl.load(f)
+            parsed = self._load_cached()
+            if parsed is None:
+                with open(self.config_file, 'r') as f:
+                    parsed = hcl.load(f)
+                self._save_cached(parsed)
             
             # Merge with defaults
-            config = self._merge_config(self.DEFAULT_CONFIG, parsed)
+            config = self._merge_config(parsed)
             
             return config
             
         except Exception as e:
             logger.error(f"Error loading config file {self.config_file}: {e}")
             logger.info("Using default configuration")
-            return self.DEFAULT_CONFIG.copy()
+            return self._merge_config({})
+    
+    @property
+    def cache_file(self) -> str:
+        """Path of the parsed-config cache next to the HCL file"""
+        return self.config_file + '.json'
+    
+    def _load_cached(self):
+        """Return the cached parse of the config file, or None if stale"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+            config = cached.get('config')
+            # Anything but a dict is a bad cache, not an empty config
+            if (isinstance(config, dict) and
+                    cached.get('mtime_ns') == os.stat(self.config_file).st_mtime_ns):
+                return config
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return None
+    
+    def _save_cached(self, parsed: Dict[str, Any]):
+        """Cache the parsed config as JSON, pyhcl is slow to start up"""
+        tmp_file = self.cache_file + '.tmp'
+        try:
+            st = os.stat(self.config_file)
+            # The cache holds the source password, keep the config's mode
+            mode = stat.S_IMODE(st.st_mode)
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+            with os.fdopen(fd, 'w') as f:
+                os.fchmod(fd, mode)
+                json.dump({
+                    'mtime_ns': st.st_mtime_ns,
+                    'config': parsed,
+                }, f)
+            os.replace(tmp_file, self.cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            # A read-only config directory just means no cache
+            logger.debug(f"Could not write config cache {self.cache_file}: {e}")
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
     
     def get(self, section: str, key: str = None, default=None):
         """Get configuration value"""
         if key is None:
             return self.data.get(section, {})
-        return self.data.get(section, {}).get(key, default)
+        return self._flat.get((section, key), default)
     
     def validate(self) -> bool:
         """Validate configuration"""
         errors = []
+        flat = self._flat
+        source_password = flat.get(('server', 'source_password'))
+        source_port = flat.get(('server', 'source_port'))
+        listen_port = flat.get(('server', 'listen_port'))
+        buffer_size = flat.get(('buffer', 'size_mb'))
+        playlist_dir = flat.get(('playlist', 'directory'))
         
         # Check required fields
-        if not self.get('server', 'source_password'):
+        if not source_password:
             errors.append("server.source_password is required")
         
-        if self.get('server', 'source_password') == 'hackme':
+        if source_password == 'hackme':
             logger.warning(" Using default password 'hackme' - change this in production!")
         
-        if self.get('advanced', 'flask_secret_key') == 'change-me-in-production':
+        if flat.get(('advanced', 'flask_secret_key')) == 'change-me-in-production':
             logger.warning(" Using default Flask secret key - change this in production!")
         
         # Check ports
-        source_port = self.get('server', 'source_port')
-        listen_port = self.get('server', 'listen_port')
-        
         if not (1 <= source_port <= 65535):
             errors.append(f"Invalid source_port: {source_port}")
         
@@ -125,12 +183,10 @@ class Config:
             errors.append("source_port and listen_port must be different")
         
         # Check buffer size
-        buffer_size = self.get('buffer', 'size_mb')
         if buffer_size < 1 or buffer_size > 1000:
             errors.append(f"buffer.size_mb should be between 1 and 1000, got {buffer_size}")
         
         # Check playlist directory
-        playlist_dir = self.get('playlist', 'directory')
         if not os.path.exists(playlist_dir):
             logger.warning(f"Playlist directory {playlist_dir} does not exist")
         
@@ -144,12 +200,11 @@ class Config:
     
     def __repr__(self):
         """String representation of config"""
-        lines = ["Cycast Configuration:"]
-        for section, values in self.data.items():
-            lines.append(f"  [{section}]")
-            for key, value in values.items():
-                lines.append(f"    {key} = {value}")
-        return "\n".join(lines)
+        return "\n".join(["Cycast Configuration:"] + [
+            line
+            for section, values in self.data.items()
+            for line in [f"  [{section}]"] + [f"    {key} = {value}" for key, value in values.items()]
+        ])
 
 
 def load_config(config_file: str = 'config.hcl') -> Config:
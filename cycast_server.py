@@ -5,20 +5,25 @@ Accepts sources from Mixxx, VLC, etc. and falls back to playlists
 Web interface powered by Flask on Tornado
 """
 
+import collections
 import socket
 import threading
 import time
 import base64
+import hmac
 import os
 import random
+import re
 import sys
 import logging
-import asyncio
-import queue as Queue
+from datetime import timedelta
+
+import orjson
 
 # Import Cython modules for performance
 import audio_buffer
 import stream_broadcaster
+import audio_kernels
 
 # Import configuration loader
 from config_loader import load_config
@@ -27,6 +32,8 @@ from config_loader import load_config
 from tornado.wsgi import WSGIContainer
 from tornado.httpserver import HTTPServer as TornadoHTTPServer
 from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
+import tornado.locks
 import tornado.web
 from flask_app import StreamWebApp
 
@@ -39,9 +46,43 @@ logging.basicConfig(
 logger = logging.getLogger('cycast')
 
 
+class _IOLoopStreamWriter:
+    """
+    Broadcaster-side writer for TornadoStreamHandler
+    write() runs on the broadcaster thread: it parks the chunk in a bounded
+    deque and wakes the handler with IOLoop.add_callback, scheduling at most
+    one callback per drain so a busy stream doesn't flood the loop.
+    """
+    
+    __slots__ = ('chunks', 'io_loop', 'ready', 'wake_pending', 'active')
+    
+    def __init__(self, io_loop):
+        self.chunks = collections.deque(maxlen=500)
+        self.io_loop = io_loop
+        self.ready = tornado.locks.Event()
+        self.wake_pending = False
+        self.active = True
+    
+    def write(self, data):
+        if self.active:
+            # Append before checking the flag, the handler clears the flag
+            # before draining, so a chunk can never be left behind
+            self.chunks.append(data)
+            if not self.wake_pending:
+                self.wake_pending = True
+                self.io_loop.add_callback(self.ready.set)
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.active = False
+        self.io_loop.add_callback(self.ready.set)
+
+
 class TornadoStreamHandler(tornado.web.RequestHandler):
     """
-    Native Tornado async handler for /stream endpoint
+    Native Tornado async handler for the mount point
     This fixes the VLC startup delay issue by using proper async streaming
     instead of Flask WSGI generators
     """
@@ -49,100 +90,120 @@ class TornadoStreamHandler(tornado.web.RequestHandler):
     def initialize(self, stream_server):
         """Initialize with reference to the StreamServer instance"""
         self.stream_server = stream_server
+        self.writer = None
     
     async def get(self):
         """Handle GET request for audio stream"""
         client_ip = self.request.remote_ip
         logger.info(f"New listener from {client_ip} (Tornado async handler)")
         
-        # Set response headers
-        self.set_header('Content-Type', 'audio/mpeg')
-        self.set_header('Cache-Control', 'no-cache, no-store')
-        self.set_header('Pragma', 'no-cache')
-        self.set_header('Connection', 'close')
-        self.set_header('Accept-Ranges', 'none')
-        
-        # ICY metadata support
+        # Set response headers, with ICY metadata support
         if self.request.headers.get('Icy-MetaData') == '1' and \
-           self.stream_server.config.get('metadata', 'enable_icy'):
-            self.set_header('icy-metaint', 
-                          str(self.stream_server.config.get('metadata', 'icy_metaint')))
-            self.set_header('icy-name', 
-                          self.stream_server.config.get('metadata', 'station_name'))
-            self.set_header('icy-genre', 
-                          self.stream_server.config.get('metadata', 'station_genre'))
-            self.set_header('icy-url', 
-                          self.stream_server.config.get('metadata', 'station_url'))
-        
-        # Create queue-based writer for the broadcaster
-        class StreamWriter:
-            def __init__(self):
-                self.queue = Queue.Queue(maxsize=500)
-                self.active = True
-            
-            def write(self, data):
-                if self.active:
-                    try:
-                        self.queue.put(data, block=False)
-                    except Queue.Full:
-                        pass
-            
-            def flush(self):
-                pass
-            
-            def close(self):
-                self.active = False
-        
-        writer = StreamWriter()
-        listener_id = self.stream_server.broadcaster.add_listener(writer)
+           self.stream_server.enable_icy:
+            headers = self.stream_server.stream_headers_icy
+        else:
+            headers = self.stream_server.stream_headers
+        for name, value in headers:
+            self.set_header(name, value)
+        
+        # The broadcaster pushes chunks onto this loop, no executor polling
+        writer = self.writer = _IOLoopStreamWriter(IOLoop.current())
+        broadcaster = self.stream_server.broadcaster
+        listener_id = broadcaster.add_listener(writer)
+        if listener_id < 0:
+            raise tornado.web.HTTPError(503, reason="Listener limit reached")
+        self.stream_server.notify_status_changed()
         
         try:
-            # Stream data asynchronously
-            loop = asyncio.get_event_loop()
+            # Send the headers now, then hand each chunk straight to the
+            # connection instead of RequestHandler's write buffer, which
+            # would re-join and re-check every chunk before passing it on
+            await self.flush()
+            connection = self.request.connection
+            chunks = writer.chunks
             
-            while self.stream_server.broadcaster.is_listener_active(listener_id):
-                try:
-                    # Get data from queue asynchronously (non-blocking)
-                    # This is the key difference from Flask WSGI
-                    data = await loop.run_in_executor(
-                        None,  # Use default executor
-                        self._get_from_queue,
-                        writer.queue
-                    )
-                    
-                    if data:
-                        self.write(data)
-                        await self.flush()
-                        
-                except Queue.Empty:
-                    # No data available, continue waiting
-                    await asyncio.sleep(0.01)
-                    continue
-                except Exception as e:
-                    logger.error(f"Listener {client_ip} streaming error: {e}")
-                    break
-                    
+            while writer.active and broadcaster.is_listener_active(listener_id):
+                await writer.ready.wait()
+                writer.ready.clear()
+                writer.wake_pending = False
+                
+                # Send everything that arrived as one write and wait for it to
+                # drain, so at most one batch ever sits in the IOStream buffer
+                # and a slow client falls behind in the bounded deque instead
+                if chunks:
+                    batch = [chunks.popleft() for _ in range(len(chunks))]
+                    await connection.write(b''.join(batch))
+
+        except StreamClosedError:
+            pass
         except Exception as e:
-            logger.error(f"Listener {client_ip} connection error: {e}")
+            logger.error(f"Listener {client_ip} streaming error: {e}")
         finally:
             writer.close()
-            self.stream_server.broadcaster.remove_listener(listener_id)
+            broadcaster.remove_listener(listener_id)
+            self.stream_server.notify_status_changed()
             logger.info(f"Listener {client_ip} cleanup complete")
     
-    def _get_from_queue(self, q):
-        """Helper to get data from queue with timeout"""
-        try:
-            return q.get(timeout=0.5)
-        except Queue.Empty:
-            raise
-    
     def on_connection_close(self):
         """Called when client disconnects"""
         logger.info(f"Listener {self.request.remote_ip} disconnected (connection closed)")
+        if self.writer is not None:
+            self.writer.close()
+
+
+class TornadoEventsHandler(tornado.web.RequestHandler):
+    """
+    Server-Sent Events feed of the /api/status data
+    Pushes a new snapshot only when the server reports a change, so open
+    status pages cost nothing while nothing happens.
+    """
+    
+    # The uptime shown on the page changes once a minute
+    REFRESH_INTERVAL = timedelta(seconds=60)
+    
+    def initialize(self, stream_server, web_app):
+        """Initialize with the StreamServer and the StreamWebApp for status data"""
+        self.stream_server = stream_server
+        self.web_app = web_app
+        self.closed = False
+    
+    async def get(self):
+        """Stream status updates until the client goes away"""
+        self.set_header('Content-Type', 'text/event-stream')
+        self.set_header('Cache-Control', 'no-cache')
+        
+        stream_server = self.stream_server
+        last_event = None
+        try:
+            while not self.closed:
+                version = stream_server.status_version
+                event = b'data: ' + orjson.dumps(self.web_app.get_status_data()) + b'\n\n'
+                if event != last_event:
+                    self.write(event)
+                    await self.flush()
+                    last_event = event
+                
+                # Only sleep if nothing changed while this update was sent
+                if version == stream_server.status_version:
+                    await stream_server.status_changed.wait(timeout=self.REFRESH_INTERVAL)
+        except StreamClosedError:
+            pass
+    
+    def on_connection_close(self):
+        """Wake the waiting get() so a closed page doesn't linger until the refresh"""
+        self.closed = True
+        self.stream_server.status_changed.notify_all()
 
 
 
 class StreamServer:
+    # Source handshake headers, matched against the raw request bytes
+    _auth_prefix = b'Authorization: Basic '
+    _ct_prefix = b'Content-Type:'
+    
+    # Sources connect one at a time, a couple of accept threads is plenty
+    MAX_SOURCE_SOCKETS = 2
+    
     def __init__(self, config):
         """Initialize stream server with HCL configuration"""
         self.config = config
@@ -152,76 +213,129 @@ class StreamServer:
         self.source_port = config.get('server', 'source_port')
         self.listen_port = config.get('server', 'listen_port')
         self.source_password = config.get('server', 'source_password')
+        self._source_password_bytes = str(self.source_password).encode('utf-8')
         self.mount_point = config.get('server', 'mount_point')
+        self.buffer_size_mb = config.get('buffer', 'size_mb')
+        self.chunk_size = int(config.get('broadcaster', 'chunk_size'))
+        self.max_listeners = int(config.get('advanced', 'max_listeners'))
+        self.playlist_directory = config.get('playlist', 'directory')
+        self.playlist_shuffle = config.get('playlist', 'shuffle')
+        self.playlist_extensions = frozenset(ext.lower() for ext in config.get('playlist', 'extensions'))
+        self.station_name = config.get('metadata', 'station_name')
+        self.station_genre = config.get('metadata', 'station_genre')
+        self.station_url = config.get('metadata', 'station_url')
+        self.enable_icy = config.get('metadata', 'enable_icy')
+        self.icy_metaint = config.get('metadata', 'icy_metaint')
+        self.enable_stats = config.get('advanced', 'enable_stats')
+        
+        # Listener response headers as (name, value) pairs, built once
+        self.stream_headers = (
+            ('Content-Type', 'audio/mpeg'),
+            ('Cache-Control', 'no-cache, no-store'),
+            ('Pragma', 'no-cache'),
+            ('Connection', 'close'),
+            ('Accept-Ranges', 'none'),
+        )
+        self.stream_headers_icy = self.stream_headers + (
+            ('icy-metaint', str(self.icy_metaint)),
+            ('icy-name', self.station_name),
+            ('icy-genre', self.station_genre),
+            ('icy-url', self.station_url),
+        )
         
         # Stream state
         self.current_source = None
         self.source_lock = threading.Lock()
+        # Mirrors current_source for lock-free readers, only set under source_lock
+        self.source_connected = False
+        
+        # Status change notifications for /api/events, delivered on the IOLoop
+        self.io_loop = None
+        self.status_version = 0
+        self.status_changed = tornado.locks.Condition()
         
         # Use Cython-optimized audio buffer
-        buffer_size = config.get('buffer', 'size_mb')
-        self.audio_buffer = audio_buffer.CircularAudioBuffer(size_mb=buffer_size)
+        self.audio_buffer = audio_buffer.CircularAudioBuffer(size_mb=self.buffer_size_mb)
         
-        # Use Cython-optimized broadcaster with configured chunk size
-        chunk_size = config.get('broadcaster', 'chunk_size')
-        self.broadcaster = stream_broadcaster.StreamBroadcaster(self.audio_buffer, chunk_size=chunk_size)
+        # Use Cython-optimized broadcaster with configured chunk size and capacity
+        self.broadcaster = stream_broadcaster.StreamBroadcaster(
+            self.audio_buffer, chunk_size=self.chunk_size, max_listeners=self.max_listeners)
         
         # Playlist fallback
         self.playlist_files = []
         self.playlist_active = False
-        self.current_metadata = {"title": config.get('metadata', 'station_name'), "artist": ""}
-        self.metadata_lock = threading.Lock()
+        # Replaced wholesale and never mutated, so readers need no lock
+        self.current_metadata = {"title": self.station_name, "artist": ""}
         
         # Statistics
         self.bytes_sent = 0
         self.start_time = time.time()
+        self.start_monotonic = time.monotonic()  # For uptime, immune to clock changes
         
     def load_playlist(self, directory=None):
         """Load MP3 files from directory for fallback playlist"""
         if directory is None:
-            directory = self.config.get('playlist', 'directory')
+            directory = self.playlist_directory
         
         if not os.path.exists(directory):
             logger.info(f"Playlist directory {directory} not found")
             return
         
-        extensions = tuple(self.config.get('playlist', 'extensions'))
-        
-        for file in os.listdir(directory):
-            if file.lower().endswith(extensions):
-                self.playlist_files.append(os.path.join(directory, file))
+        # DirEntry caches the file type, so skipped entries cost no extra stat
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1].lower() in self.playlist_extensions \
+                        and entry.is_file():
+                    self.playlist_files.append(entry.path)
         
         if self.playlist_files:
             logger.info(f"Loaded {len(self.playlist_files)} files into playlist")
-            if self.config.get('playlist', 'shuffle'):
+            if self.playlist_shuffle:
                 random.shuffle(self.playlist_files)
         else:
             logger.info("No audio files found in playlist directory")
     
-    def parse_icy_metadata(self, data):
-        """Parse Icecast metadata from stream"""
+    def set_stream_title(self, raw_title):
+        """Update current metadata from a raw StreamTitle value (any buffer)"""
         try:
-            if b"StreamTitle='" in data:
-                start = data.find(b"StreamTitle='") + 13
-                end = data.find(b"';", start)
-                if end > start:
-                    title = data[start:end].decode('utf-8', errors='ignore')
-                    with self.metadata_lock:
-                        if ' - ' in title:
-                            artist, track = title.split(' - ', 1)
-                            self.current_metadata = {"title": track, "artist": artist}
-                        else:
-                            self.current_metadata = {"title": title, "artist": ""}
+            # Decode straight from the buffer, only the title bytes
+            title = str(raw_title, 'utf-8', 'ignore')
+            artist, sep, track = title.partition(' - ')
+            if sep:
+                metadata = {"title": track, "artist": artist}
+            else:
+                metadata = {"title": title, "artist": ""}
+            self.set_metadata(metadata)
         except Exception as e:
             logger.error(f"Error parsing metadata: {e}")
     
+    def set_metadata(self, metadata):
+        """Publish new now-playing metadata (a fresh dict, never mutated later)"""
+        if metadata != self.current_metadata:
+            self.current_metadata = metadata
+            self.notify_status_changed()
+    
+    def notify_status_changed(self):
+        """Wake /api/events subscribers, safe to call from any thread"""
+        if self.io_loop is not None:
+            self.io_loop.add_callback(self._on_status_changed)
+    
+    def _on_status_changed(self):
+        """Runs on the IOLoop"""
+        self.status_version += 1
+        self.status_changed.notify_all()
+    
     def playlist_feeder(self):
         """Feed audio from playlist files when no source is connected"""
         current_file_index = 0
         
+        # Every chunk is read into the same buffer, the ring copies it out
+        chunk_size = 65536
+        read_buf = bytearray(chunk_size)
+        read_view = memoryview(read_buf)
+        
         while True:
-            with self.source_lock:
-                should_play = self.current_source is None
+            should_play = not self.source_connected
             
             if should_play and self.playlist_files:
                 if not self.playlist_active:
@@ -232,46 +346,45 @@ class StreamServer:
                     file_path = self.playlist_files[current_file_index]
                     filename = os.path.basename(file_path)
                     
-                    with self.metadata_lock:
-                        self.current_metadata = {
-                            "title": filename,
-                            "artist": "Playlist"
-                        }
+                    self.set_metadata({
+                        "title": filename,
+                        "artist": "Playlist"
+                    })
                     
                     logger.info(f"Playing from playlist: {filename}")
                     
-                    with open(file_path, 'rb') as f:
+                    # Stream the file through one reusable buffer. A plain read
+                    # just hits EOF if the track is replaced while it plays,
+                    # where a mapping would fault (SIGBUS) on truncated pages.
+                    bytes_written = 0
+                    
+                    with open(file_path, 'rb', buffering=0) as f:
                         # Skip ID3v2 tags if present
-                        header = f.read(10)
-                        if header[:3] == b'ID3':
-                            size = ((header[6] & 0x7f) << 21) | ((header[7] & 0x7f) << 14) | \
-                                   ((header[8] & 0x7f) << 7) | (header[9] & 0x7f)
-                            f.seek(size + 10)
+                        n = f.readinto(read_view[:10])
+                        if n == 10 and read_view[:3] == b'ID3':
+                            f.seek(audio_kernels.parse_id3_size(read_view[6:10]) + 10)
                         else:
                             f.seek(0)
                         
-                        # Stream the file in chunks
-                        chunk_size = 8192
-                        bytes_written = 0
+                        # Let the kernel read ahead, as the mapping did
+                        if hasattr(os, 'posix_fadvise'):
+                            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
                         
                         while True:
-                            with self.source_lock:
-                                if self.current_source is not None:
-                                    logger.info("Live source connected, stopping playlist")
-                                    self.playlist_active = False
-                                    break
-                            
-                            chunk = f.read(chunk_size)
-                            if not chunk:
+                            if self.source_connected:
+                                logger.info("Live source connected, stopping playlist")
+                                self.playlist_active = False
                                 break
                             
-                            # Write to Cython buffer with minimal blocking
-                            while not self.audio_buffer.write(chunk):
-                                time.sleep(0.0001)  # 0.1ms micro-sleep
+                            n = f.readinto(read_buf)
+                            if not n:
+                                break
                             
-                            bytes_written += len(chunk)
-                        
-                        logger.info(f"Finished playing {filename} ({bytes_written} bytes)")
+                            # Write to Cython buffer, waiting for space if full
+                            self.audio_buffer.write(read_view[:n], block=True)
+                            bytes_written += n
+                    
+                    logger.info(f"Finished playing {filename} ({bytes_written} bytes)")
                     
                     current_file_index = (current_file_index + 1) % len(self.playlist_files)
                     
@@ -301,12 +414,15 @@ class StreamServer:
                 except socket.timeout:
                     return
             
-            request_str = request.decode('utf-8', errors='ignore')
-            lines = request_str.split('\r\n')
+            # Parse the headers as bytes, only decoding the values we use
+            header_end = request.find(b'\r\n\r\n')
+            if header_end < 0:
+                header_end = len(request)
+            lines = request[:header_end].split(b'\r\n')
             
             # Parse request line
-            if not lines[0].startswith(('SOURCE', 'PUT')):
-                logger.warning(f"Not a valid source request: {lines[0]}")
+            if not lines[0].startswith((b'SOURCE', b'PUT')):
+                logger.warning(f"Not a valid source request: {lines[0].decode('utf-8', errors='ignore')}")
                 conn.sendall(b'HTTP/1.1 405 Method Not Allowed\r\n\r\n')
                 return
             
@@ -315,17 +431,16 @@ class StreamServer:
             content_type = 'audio/mpeg'
             
             for line in lines:
-                if line.startswith('Authorization: Basic '):
+                if line.startswith(self._auth_prefix):
                     try:
-                        auth_data = base64.b64decode(line.split(' ')[2]).decode('utf-8')
-                        if ':' in auth_data:
-                            username, password = auth_data.split(':', 1)
-                            if password == self.source_password:
-                                authenticated = True
+                        auth_data = base64.b64decode(line[len(self._auth_prefix):].strip())
+                        username, sep, password = auth_data.partition(b':')
+                        if sep and hmac.compare_digest(password, self._source_password_bytes):
+                            authenticated = True
                     except Exception as e:
                         logger.error(f"Auth decode error: {e}")
-                elif line.startswith('Content-Type:'):
-                    content_type = line.split(':', 1)[1].strip()
+                elif line.startswith(self._ct_prefix):
+                    content_type = line[len(self._ct_prefix):].strip().decode('utf-8', errors='ignore')
             
             if not authenticated:
                 logger.warning("Authentication failed")
@@ -345,28 +460,35 @@ class StreamServer:
                     except:
                         pass
                 self.current_source = conn
+                self.source_connected = True
+                self.notify_status_changed()
             
-            with self.metadata_lock:
-                self.current_metadata = {"title": "Live Stream", "artist": ""}
+            self.set_metadata({"title": "Live Stream", "artist": ""})
             
             # Read and broadcast audio data
             conn.settimeout(10.0)
             chunk_size = 8192
             
+            # Receive into one preallocated buffer instead of a new bytes per recv
+            recv_buf = bytearray(chunk_size)
+            recv_view = memoryview(recv_buf)
+            icy_scanner = audio_kernels.IcyTitleScanner()
+            
             while True:
                 try:
-                    chunk = conn.recv(chunk_size)
-                    if not chunk:
+                    n = conn.recv_into(recv_buf)
+                    if not n:
                         logger.info("Source disconnected")
                         break
                     
-                    # Check for Icecast metadata (simplified)
-                    if b"StreamTitle=" in chunk:
-                        self.parse_icy_metadata(chunk)
+                    # Check for Icecast metadata, even if split across recvs
+                    raw_title = icy_scanner.feed(recv_buf, n)
+                    if raw_title is not None:
+                        with raw_title:
+                            self.set_stream_title(raw_title)
                     
-                    # Write to Cython buffer
-                    while not self.audio_buffer.write(chunk):
-                        time.sleep(0.001)
+                    # Write to Cython buffer, waiting for space if full
+                    self.audio_buffer.write(recv_view[:n], block=True)
                     
                 except socket.timeout:
                     logger.warning("Source connection timeout")
@@ -381,20 +503,58 @@ class StreamServer:
             with self.source_lock:
                 if self.current_source == conn:
                     self.current_source = None
+                    self.source_connected = False
+                    self.notify_status_changed()
             try:
                 conn.close()
             except:
                 pass
             logger.info("Source handler exiting")
     
-    def source_listener(self):
-        """Listen for incoming source connections"""
+    def _bind_source_socket(self, reuse_port=False):
+        """Create a listening socket on the source port"""
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         sock.bind((self.host, self.source_port))
         sock.listen(5)
+        return sock
+    
+    def source_listener(self):
+        """Listen for incoming source connections
+        
+        Where SO_REUSEPORT is available, each accept thread gets its own
+        socket on the source port and the kernel spreads connections
+        across them. SO_REUSEPORT would also let a second Cycast instance
+        share the port silently, so the port is first bound exclusively:
+        that fails with EADDRINUSE if anything else already holds it.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            probe.bind((self.host, self.source_port))
+        
+        sockets = []
+        count = min(os.cpu_count() or 1, self.MAX_SOURCE_SOCKETS)
+        if hasattr(socket, 'SO_REUSEPORT') and count > 1:
+            try:
+                for _ in range(count):
+                    sockets.append(self._bind_source_socket(reuse_port=True))
+            except OSError as e:
+                logger.warning(f"SO_REUSEPORT unavailable, using one accept thread: {e}")
+                for sock in sockets:
+                    sock.close()
+                sockets = []
+        if not sockets:
+            sockets.append(self._bind_source_socket())
         print(f"Source server listening on {self.host}:{self.source_port}")
         
+        for sock in sockets[1:]:
+            threading.Thread(target=self._accept_sources, args=(sock,), daemon=True).start()
+        self._accept_sources(sockets[0])
+    
+    def _accept_sources(self, sock):
+        """Accept source connections on sock, one handler thread each"""
         while True:
             try:
                 conn, addr = sock.accept()
@@ -413,8 +573,8 @@ class StreamServer:
         logger.info(f"Source port: {self.source_port} (password: {self.source_password})")
         logger.info(f"Listen port: {self.listen_port}")
         logger.info(f"Mount point: {self.mount_point}")
-        logger.info(f"Station: {self.config.get('metadata', 'station_name')}")
-        logger.info(f"Buffer size: {self.config.get('buffer', 'size_mb')} MB")
+        logger.info(f"Station: {self.station_name}")
+        logger.info(f"Buffer size: {self.buffer_size_mb} MB")
         logger.info("=" * 60)
         
         # Start source listener thread
@@ -429,6 +589,9 @@ class StreamServer:
         else:
             logger.info("No playlist configured - will only stream from live sources")
         
+        # Compile the byte-scanning kernels before any audio flows
+        audio_kernels.warmup()
+        
         # Start broadcaster thread
         self.broadcaster.start()
         
@@ -446,18 +609,22 @@ class StreamServer:
         wsgi_container = WSGIContainer(flask_app)
         
         # Create Tornado application with hybrid routing:
-        # - Native Tornado async handler for /stream (fixes VLC issue)
+        # - Native Tornado async handler for the mount point (fixes VLC issue)
         # - Flask WSGI for everything else (/, /api/*, etc.)
         tornado_app = tornado.web.Application([
             # Native async handler for audio streaming
-            (r"/stream", TornadoStreamHandler, dict(stream_server=self)),
+            (re.escape(self.mount_point), TornadoStreamHandler, dict(stream_server=self)),
+            
+            # Long-lived status push, kept off the WSGI container
+            (r"/api/events", TornadoEventsHandler, dict(stream_server=self, web_app=web_app)),
             
             # All other routes handled by Flask WSGI
             (r".*", tornado.web.FallbackHandler, dict(fallback=wsgi_container)),
         ])
         
         logger.info("Using hybrid Flask/Tornado routing:")
-        logger.info("  /stream -> Tornado async handler (fixes VLC)")
+        logger.info(f"  {self.mount_point} -> Tornado async handler (fixes VLC)")
+        logger.info("  /api/events -> Tornado Server-Sent Events")
         logger.info("  /* -> Flask WSGI (status page, API)")
         
         # Create HTTP server with settings optimized for streaming
@@ -478,7 +645,7 @@ class StreamServer:
         logger.info(f"Connect your source to: http://{self.host}:{self.source_port}{self.mount_point}")
         logger.info(f"Listen at: http://{self.host}:{self.listen_port}{self.mount_point}")
         logger.info(f"Status page: http://{self.host}:{self.listen_port}/")
-        if self.config.get('advanced', 'enable_stats'):
+        if self.enable_stats:
             logger.info(f"Statistics: http://{self.host}:{self.listen_port}/api/stats")
         logger.info("=" * 60)
         logger.info("")
@@ -488,7 +655,8 @@ class StreamServer:
         
         try:
             # Start Tornado IOLoop
-            IOLoop.current().start()
+            self.io_loop = IOLoop.current()
+            self.io_loop.start()
         except KeyboardInterrupt:
             logger.info("")
             logger.info("Shutting down...")
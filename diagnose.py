@@ -6,7 +6,38 @@ Tests all components and identifies issues
 
 import sys
 import os
+import io
 import time
+import collections
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ThreadOutput:
+    """sys.stdout stand-in that gives each capturing thread its own buffer
+    
+    Lets independent diagnostics run in parallel while their output is
+    still printed in order afterwards.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+    
+    def write(self, text):
+        return getattr(self.local, 'buffer', self.stream).write(text)
+    
+    def flush(self):
+        getattr(self.local, 'buffer', self.stream).flush()
+    
+    def capture(self, func):
+        """Run func, returns (result, everything it printed)"""
+        self.local.buffer = io.StringIO()
+        try:
+            return func(), self.local.buffer.getvalue()
+        finally:
+            del self.local.buffer
 
 def test_imports():
     """Test that all modules can be imported"""
@@ -93,7 +124,6 @@ def test_config():
         
     except Exception as e:
         print(f"  ✗ Config error: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -138,11 +168,11 @@ def test_buffer_and_broadcaster():
         # Test broadcaster with fake listener
         class FakeListener:
             def __init__(self):
-                self.data = b''
+                self.chunks = []
                 self.active = True
             
             def write(self, data):
-                self.data += data
+                self.chunks.append(data)
             
             def flush(self):
                 pass
@@ -155,8 +185,9 @@ def test_buffer_and_broadcaster():
         time.sleep(0.5)
         
         # Check listener received data
-        if len(listener.data) > 0:
-            print(f"  ✓ Listener received {len(listener.data)} bytes")
+        received = sum(map(len, listener.chunks))
+        if received > 0:
+            print(f"  ✓ Listener received {received} bytes")
         else:
             print("  ✗ Listener received no data")
             print(f"    Buffer available: {buf.available()}")
@@ -173,7 +204,6 @@ def test_buffer_and_broadcaster():
         
     except Exception as e:
         print(f"  ✗ Buffer/broadcaster error: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -210,32 +240,28 @@ def test_streaming_simulation():
     try:
         import audio_buffer
         import stream_broadcaster
-        import queue
         
         # Create components
         buf = audio_buffer.CircularAudioBuffer(size_mb=1)
         broadcaster = stream_broadcaster.StreamBroadcaster(buf)
         broadcaster.start()
         
-        # Create a queue-based listener (like Flask uses)
-        class QueueListener:
+        # Create a deque-based listener (like the stream handlers use)
+        class DequeListener:
             def __init__(self):
-                self.queue = queue.Queue(maxsize=100)
+                self.chunks = collections.deque(maxlen=100)
                 self.active = True
             
             def write(self, data):
                 if self.active:
-                    try:
-                        self.queue.put(data, block=False)
-                    except queue.Full:
-                        pass
+                    self.chunks.append(data)
             
             def flush(self):
                 pass
         
-        listener = QueueListener()
+        listener = DequeListener()
         listener_id = broadcaster.add_listener(listener)
-        print("  ✓ Created queue-based listener")
+        print("  ✓ Created deque-based listener")
         
         # Write data to buffer
         chunks = [b"CHUNK_%d_" % i * 100 for i in range(10)]
@@ -247,22 +273,19 @@ def test_streaming_simulation():
         # Wait for processing
         time.sleep(1.0)
         
-        # Try to read from queue
+        # Drain whatever arrived without waiting on an empty listener
         received_chunks = 0
         received_bytes = 0
         
-        try:
-            while True:
-                data = listener.queue.get(timeout=0.1)
-                received_chunks += 1
-                received_bytes += len(data)
-        except queue.Empty:
-            pass
+        while listener.chunks:
+            data = listener.chunks.popleft()
+            received_chunks += 1
+            received_bytes += len(data)
         
         if received_chunks > 0:
             print(f"  ✓ Received {received_chunks} chunks ({received_bytes} bytes)")
         else:
-            print("  ✗ No data received from queue")
+            print("  ✗ No data received by listener")
             broadcaster.stop()
             return False
         
@@ -275,7 +298,6 @@ def test_streaming_simulation():
         
     except Exception as e:
         print(f"  ✗ Streaming pipeline error: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -288,12 +310,35 @@ def main():
     
     results = []
     
-    # Run tests
-    results.append(("Module imports", test_imports()))
-    results.append(("Configuration", test_config()))
-    results.append(("Buffer & Broadcaster", test_buffer_and_broadcaster()))
-    results.append(("Playlist loading", test_playlist_loading()))
-    results.append(("Streaming pipeline", test_streaming_simulation()))
+    # Tests that share no state run in parallel; the buffer/broadcaster
+    # ones run in order on this thread
+    tests = [
+        ("Module imports", test_imports, True),
+        ("Configuration", test_config, True),
+        ("Buffer & Broadcaster", test_buffer_and_broadcaster, False),
+        ("Playlist loading", test_playlist_loading, True),
+        ("Streaming pipeline", test_streaming_simulation, False),
+    ]
+    
+    output = ThreadOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor() as pool:
+            futures = {
+                name: pool.submit(output.capture, test)
+                for name, test, independent in tests if independent
+            }
+            
+            # Run tests, replaying captured output in the original order
+            for name, test, independent in tests:
+                if independent:
+                    passed, text = futures[name].result()
+                    output.write(text)
+                else:
+                    passed = test()
+                results.append((name, passed))
+    finally:
+        sys.stdout = output.stream
     
     # Summary
     print("\n" + "=" * 60)
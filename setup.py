@@ -1,18 +1,29 @@
+import os
+import sys
 from setuptools import setup, Extension
 from Cython.Build import cythonize
 import numpy as np
 
+compile_args = ['-O3', '-march=native', '-funroll-loops', '-fvisibility=hidden']
+link_args = []
+if sys.platform.startswith('linux'):
+    # ELF/GNU ld only: direct calls instead of PLT stubs, trimmed link
+    compile_args += ['-fno-plt', '-fno-semantic-interposition']
+    link_args += ['-Wl,-O1', '-Wl,--as-needed']
+
 extensions = [
     Extension(
         "audio_buffer",
         ["audio_buffer.pyx"],
-        extra_compile_args=['-O3', '-march=native', '-ffast-math'],
+        extra_compile_args=compile_args + ['-ffast-math'],
+        extra_link_args=link_args,
         language="c"
     ),
     Extension(
         "stream_broadcaster",
         ["stream_broadcaster.pyx"],
-        extra_compile_args=['-O3', '-march=native'],
+        extra_compile_args=compile_args,
+        extra_link_args=link_args,
         language="c"
     ),
 ]
@@ -21,11 +32,17 @@ setup(
     name="Cycast Cython Modules",
     ext_modules=cythonize(
         extensions,
+        nthreads=os.cpu_count() or 1,
         compiler_directives={
             'language_level': 3,
             'boundscheck': False,
             'wraparound': False,
             'cdivision': True,
+            'initializedcheck': False,
+            'overflowcheck': False,
+            'infer_types': True,
+            'profile': False,
+            'linetrace': False,
             'embedsignature': True,
         }
     ),
@@ -16,6 +16,31 @@ cimport cython
 # Get logger
 logger = logging.getLogger('cycast.broadcaster')
 
+# Most chunks a backlog is coalesced into for one broadcast. Listener queues
+# are bounded by chunk count, so this also caps their worst-case memory.
+MAX_BATCH_CHUNKS = 4
+
+@cython.final
+cdef class _Listener:
+    """Per-listener state, typed so the fan-out loop reads C fields, not dict keys"""
+    cdef:
+        int listener_id
+        object writer
+        object write  # Bound methods, resolved once instead of on every chunk
+        object flush
+        bint active
+        Py_ssize_t bytes_sent
+        double connected_at
+    
+    def __cinit__(self, int listener_id, object writer):
+        self.listener_id = listener_id
+        self.writer = writer
+        self.write = writer.write
+        self.flush = writer.flush
+        self.active = True
+        self.bytes_sent = 0
+        self.connected_at = time.monotonic()
+
 cdef class StreamBroadcaster:
     """
     High-performance broadcaster that sends audio data to multiple listeners
@@ -23,17 +48,22 @@ cdef class StreamBroadcaster:
     cdef:
         object audio_buffer  # CircularAudioBuffer instance
         dict listeners
+        tuple _snapshot
         object listeners_lock
         int next_listener_id
         object broadcast_thread
-        bint running
+        readonly bint running
         Py_ssize_t chunk_size  # Configurable chunk size
+        int max_listeners  # Fixed capacity, 0 means unlimited
     
-    def __init__(self, audio_buffer, chunk_size=16384):
+    def __init__(self, audio_buffer, chunk_size=16384, max_listeners=0):
         self.audio_buffer = audio_buffer
         self.chunk_size = chunk_size  # Configurable chunk size
+        self.max_listeners = max_listeners
         self.listeners = {}
-        self.listeners_lock = threading.RLock()
+        # Copy-on-write view of listeners, read by the broadcast thread without the lock
+        self._snapshot = ()
+        self.listeners_lock = threading.Lock()
         self.next_listener_id = 0
         self.running = False
         self.broadcast_thread = None
@@ -41,22 +71,22 @@ cdef class StreamBroadcaster:
     cpdef int add_listener(self, object socket_file):
         """
         Add a new listener
-        Returns the listener ID
+        Returns the listener ID, or -1 if max_listeners are already connected
         """
         cdef int listener_id
         
         with self.listeners_lock:
+            if self.max_listeners and len(self.listeners) >= self.max_listeners:
+                logger.warning("Listener rejected, limit of %d reached", self.max_listeners)
+                return -1
+            
             listener_id = self.next_listener_id
             self.next_listener_id += 1
             
-            self.listeners[listener_id] = {
-                'socket': socket_file,
-                'active': True,
-                'bytes_sent': 0,
-                'connected_at': time.time()
-            }
+            self.listeners[listener_id] = _Listener(listener_id, socket_file)
+            self._snapshot = tuple(self.listeners.values())
             
-            logger.info(f"Listener {listener_id} added (total: {len(self.listeners)})")
+            logger.info("Listener %d added (total: %d)", listener_id, len(self.listeners))
             return listener_id
     
     cpdef void remove_listener(self, int listener_id):
@@ -64,14 +94,15 @@ cdef class StreamBroadcaster:
         with self.listeners_lock:
             if listener_id in self.listeners:
                 del self.listeners[listener_id]
-                logger.info(f"Listener {listener_id} removed (total: {len(self.listeners)})")
+                self._snapshot = tuple(self.listeners.values())
+                logger.info("Listener %d removed (total: %d)", listener_id, len(self.listeners))
     
     cpdef bint is_listener_active(self, int listener_id):
         """Check if a listener is still active"""
+        cdef _Listener listener
         with self.listeners_lock:
-            if listener_id not in self.listeners:
-                return False
-            return self.listeners[listener_id]['active']
+            listener = self.listeners.get(listener_id)
+            return listener is not None and listener.active
     
     cpdef int get_listener_count(self):
         """Get the current number of listeners"""
@@ -85,32 +116,33 @@ cdef class StreamBroadcaster:
         This is the hot path - optimized with Cython
         """
         cdef:
-            int listener_id
-            dict listener_info
-            object socket_file
-            list to_remove = []
+            _Listener listener
+            list to_remove = None  # Only allocated once a listener fails
             Py_ssize_t chunk_size = PyBytes_Size(chunk)
         
-        with self.listeners_lock:
-            for listener_id, listener_info in list(self.listeners.items()):
-                if not listener_info['active']:
-                    continue
-                
-                socket_file = listener_info['socket']
-                
-                try:
-                    socket_file.write(chunk)
-                    socket_file.flush()
-                    listener_info['bytes_sent'] += chunk_size
-                except Exception as e:
-                    # Mark for removal
-                    listener_info['active'] = False
-                    to_remove.append(listener_id)
+        # add/remove swap in a new snapshot, so no lock or copy is needed here
+        for listener in self._snapshot:
+            if not listener.active:
+                continue
             
-            # Remove disconnected listeners
-            for listener_id in to_remove:
-                if listener_id in self.listeners:
-                    del self.listeners[listener_id]
+            try:
+                listener.write(chunk)
+                listener.flush()
+                listener.bytes_sent += chunk_size
+            except Exception as e:
+                # Logged once, the listener is dropped below
+                logger.error("Error broadcasting to listener %d: %s", listener.listener_id, e)
+                listener.active = False
+                if to_remove is None:
+                    to_remove = []
+                to_remove.append(listener.listener_id)
+        
+        # Remove disconnected listeners
+        if to_remove is not None:
+            with self.listeners_lock:
+                for listener_id in to_remove:
+                    self.listeners.pop(listener_id, None)
+                self._snapshot = tuple(self.listeners.values())
     
     def _broadcast_loop(self):
         """
@@ -120,45 +152,50 @@ cdef class StreamBroadcaster:
         cdef:
             bytes chunk
             Py_ssize_t chunk_size = self.chunk_size
-            float sleep_time
-            int consecutive_empty = 0
+            Py_ssize_t max_batch = chunk_size * MAX_BATCH_CHUNKS
+            Py_ssize_t avail
+            double fill_pct
+        
+        # chunk_size is fixed for the life of the thread, so bind it and the
+        # buffer's methods once instead of looking them up every iteration
+        buf = self.audio_buffer
+        available = buf.available
+        read = buf.read
+        fill_percentage = buf.fill_percentage
+        wait_for_data = buf.wait_for_data
+        sleep = time.sleep
         
         logger.info("Broadcaster thread started")
         
         while self.running:
             # Check if we have data to send
-            if self.audio_buffer.available() >= chunk_size:
-                chunk = self.audio_buffer.read(chunk_size)
+            avail = available()
+            if avail >= chunk_size:
+                # Send a backlog of whole chunks as one write per listener
+                chunk = read(min(avail - avail % chunk_size, max_batch))
                 
                 if chunk:
                     self._broadcast_chunk(chunk)
-                    consecutive_empty = 0
                     
                     # Minimal sleep to yield CPU but stay responsive
                     # Dynamic based on buffer fill percentage
-                    fill_pct = self.audio_buffer.fill_percentage()
+                    fill_pct = fill_percentage()
                     if fill_pct > 0.8:
                         # Buffer is filling up, process faster
-                        time.sleep(0.0001)  # 0.1ms
+                        sleep(0.0001)  # 0.1ms
                     elif fill_pct > 0.5:
                         # Normal operation
-                        time.sleep(0.0005)  # 0.5ms
+                        sleep(0.0005)  # 0.5ms
                     else:
                         # Buffer running low, be gentle
-                        time.sleep(0.001)   # 1ms
+                        sleep(0.001)   # 1ms
                 else:
                     # No data despite buffer reporting available
-                    consecutive_empty += 1
-                    time.sleep(0.005)
+                    sleep(0.005)
             else:
-                # Not enough data yet - adaptive backoff
-                consecutive_empty += 1
-                
-                # Longer sleep when consistently empty to save CPU
-                if consecutive_empty > 10:
-                    time.sleep(0.02)   # 20ms if persistently empty
-                else:
-                    time.sleep(0.005)  # 5ms otherwise
+                # Not enough data yet - sleep until a writer completes a chunk.
+                # The timeout only bounds how long stop() has to wait.
+                wait_for_data(chunk_size, 0.25)
         
         logger.info("Broadcaster thread stopped")
     
@@ -187,19 +224,19 @@ cdef class StreamBroadcaster:
                 'total_bytes_sent': 0,
                 'listeners': []
             }
-            int listener_id
-            dict listener_info
+            _Listener listener
+            double now = time.monotonic()
         
         with self.listeners_lock:
             stats['total_listeners'] = len(self.listeners)
             
-            for listener_id, listener_info in self.listeners.items():
-                stats['total_bytes_sent'] += listener_info['bytes_sent']
+            for listener in self.listeners.values():
+                stats['total_bytes_sent'] += listener.bytes_sent
                 stats['listeners'].append({
-                    'id': listener_id,
-                    'bytes_sent': listener_info['bytes_sent'],
-                    'connected_seconds': int(time.time() - listener_info['connected_at']),
-                    'active': listener_info['active']
+                    'id': listener.listener_id,
+                    'bytes_sent': listener.bytes_sent,
+                    'connected_seconds': int(now - listener.connected_at),
+                    'active': listener.active
                 })
         
         return stats
@@ -10,91 +10,155 @@ import logging
 
 logger = logging.getLogger('cycast.broadcaster')
 
+# Most chunks a backlog is coalesced into for one broadcast. Listener queues
+# are bounded by chunk count, so this also caps their worst-case memory.
+MAX_BATCH_CHUNKS = 4
+
 
 class StreamBroadcaster:
     """Broadcaster that sends audio to multiple listeners - pure Python version"""
     
-    def __init__(self, audio_buffer, chunk_size=16384):
+    def __init__(self, audio_buffer, chunk_size=16384, max_listeners=0):
         self.audio_buffer = audio_buffer
         self.chunk_size = chunk_size
+        self.max_listeners = max_listeners  # Fixed capacity, 0 means unlimited
         self.listeners = {}
-        self.listeners_lock = threading.RLock()
+        # Copy-on-write view of listeners, read by the broadcast thread without the lock
+        self._snapshot = ()
+        # Every listener receives the same bytes, so per-listener counts are
+        # derived from one running total and the total at each one's first chunk
+        self.bytes_broadcast = 0
+        self._joined = []
+        self.listeners_lock = threading.Lock()
         self.next_listener_id = 0
         self.running = False
         self.broadcast_thread = None
     
     def add_listener(self, listener):
-        """Add a new listener, returns listener ID"""
+        """Add a new listener, returns listener ID or -1 if at max_listeners"""
         with self.listeners_lock:
+            if self.max_listeners and len(self.listeners) >= self.max_listeners:
+                logger.warning("Listener rejected, limit of %d reached", self.max_listeners)
+                return -1
+            
             listener_id = self.next_listener_id
             self.next_listener_id += 1
             
             self.listeners[listener_id] = {
                 'writer': listener,
-                'bytes_sent': 0,
-                'connected_at': time.time()
+                # Resolve the bound methods once instead of on every chunk
+                'write': listener.write,
+                'flush': listener.flush,
+                'active': True,
+                'first_byte': None,
+                'connected_at': time.monotonic()
             }
+            self._snapshot = tuple(self.listeners.items())
+            self._joined.append(self.listeners[listener_id])
             
-            logger.info(f"Listener {listener_id} added")
+            logger.info("Listener %d added", listener_id)
             return listener_id
     
     def remove_listener(self, listener_id):
         """Remove a listener"""
         with self.listeners_lock:
-            if listener_id in self.listeners:
-                del self.listeners[listener_id]
-                logger.info(f"Listener {listener_id} removed")
+            info = self.listeners.pop(listener_id, None)
+            if info is not None:
+                self._snapshot = tuple(self.listeners.items())
+                # Not yet stamped if no audio flowed since it joined
+                if info['first_byte'] is None:
+                    self._joined = [j for j in self._joined if j is not info]
+                logger.info("Listener %d removed", listener_id)
     
     def is_listener_active(self, listener_id):
         """Check if listener is still active"""
         with self.listeners_lock:
-            return listener_id in self.listeners
+            info = self.listeners.get(listener_id)
+            return info is not None and info['active']
+    
+    def get_listener_count(self):
+        """Get the current number of listeners"""
+        with self.listeners_lock:
+            return len(self.listeners)
     
     def _broadcast_chunk(self, chunk):
         """Send chunk to all listeners"""
-        with self.listeners_lock:
-            for listener_id, info in list(self.listeners.items()):
-                try:
-                    info['writer'].write(chunk)
-                    info['writer'].flush()
-                    info['bytes_sent'] += len(chunk)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to listener {listener_id}: {e}")
+        # add/remove swap in a new snapshot, so no lock or copy is needed here
+        listeners = self._snapshot
+        
+        # Stamp new listeners with the offset of the first chunk they get.
+        # Re-reading the snapshot under the lock keeps both in step.
+        start = self.bytes_broadcast
+        if self._joined:
+            with self.listeners_lock:
+                listeners = self._snapshot
+                for info in self._joined:
+                    info['first_byte'] = start
+                self._joined = []
+        
+        to_remove = None  # Only allocated once a listener fails
+        for listener_id, info in listeners:
+            if not info['active']:
+                continue
+            try:
+                info['write'](chunk)
+                info['flush']()
+            except Exception as e:
+                # Logged once, the listener is dropped below
+                logger.error("Error broadcasting to listener %d: %s", listener_id, e)
+                info['active'] = False
+                if to_remove is None:
+                    to_remove = []
+                to_remove.append(listener_id)
+        self.bytes_broadcast = start + len(chunk)
+        
+        # Remove disconnected listeners
+        if to_remove is not None:
+            with self.listeners_lock:
+                for listener_id in to_remove:
+                    self.listeners.pop(listener_id, None)
+                self._snapshot = tuple(self.listeners.items())
     
     def _broadcast_loop(self):
         """Main broadcast loop"""
-        logger.info("Broadcaster thread started")
+        # chunk_size is fixed for the life of the thread, so bind it and the
+        # buffer's methods once instead of looking them up every iteration
+        chunk_size = self.chunk_size
+        max_batch = chunk_size * MAX_BATCH_CHUNKS
+        buf = self.audio_buffer
+        available = buf.available
+        read = buf.read
+        fill_percentage = buf.fill_percentage
+        wait_for_data = buf.wait_for_data
+        broadcast_chunk = self._broadcast_chunk
+        sleep = time.sleep
         
-        consecutive_empty = 0
+        logger.info("Broadcaster thread started")
         
         while self.running:
             # Check if we have data
-            if self.audio_buffer.available() >= self.chunk_size:
-                chunk = self.audio_buffer.read(self.chunk_size)
+            avail = available()
+            if avail >= chunk_size:
+                # Send a backlog of whole chunks as one write per listener
+                chunk = read(min(avail - avail % chunk_size, max_batch))
                 
                 if chunk:
-                    self._broadcast_chunk(chunk)
-                    consecutive_empty = 0
+                    broadcast_chunk(chunk)
                     
                     # Dynamic sleep based on buffer fill
-                    fill_pct = self.audio_buffer.fill_percentage()
+                    fill_pct = fill_percentage()
                     if fill_pct > 0.8:
-                        time.sleep(0.0001)  # 0.1ms
+                        sleep(0.0001)  # 0.1ms
                     elif fill_pct > 0.5:
-                        time.sleep(0.0005)  # 0.5ms
+                        sleep(0.0005)  # 0.5ms
                     else:
-                        time.sleep(0.001)   # 1ms
+                        sleep(0.001)   # 1ms
                 else:
-                    consecutive_empty += 1
-                    time.sleep(0.005)
+                    sleep(0.005)
             else:
-                # Not enough data
-                consecutive_empty += 1
-                
-                if consecutive_empty > 10:
-                    time.sleep(0.02)   # 20ms if persistently empty
-                else:
-                    time.sleep(0.005)  # 5ms otherwise
+                # Not enough data - sleep until a writer completes a chunk.
+                # The timeout only bounds how long stop() has to wait.
+                wait_for_data(chunk_size, 0.25)
         
         logger.info("Broadcaster thread stopped")
     
@@ -114,16 +178,25 @@ class StreamBroadcaster:
                 self.broadcast_thread.join(timeout=2.0)
             logger.info("Broadcaster stopped")
     
+    def _bytes_sent(self, info):
+        """Bytes delivered to a listener since its first chunk"""
+        first_byte = info['first_byte']
+        return 0 if first_byte is None else self.bytes_broadcast - first_byte
+    
     def get_stats(self):
         """Get statistics about listeners"""
+        now = time.monotonic()
         with self.listeners_lock:
+            sent = {lid: self._bytes_sent(info) for lid, info in self.listeners.items()}
             return {
                 'total_listeners': len(self.listeners),
+                'total_bytes_sent': sum(sent.values()),
                 'listeners': [
                     {
                         'id': lid,
-                        'bytes_sent': info['bytes_sent'],
-                        'connected_seconds': time.time() - info['connected_at']
+                        'bytes_sent': sent[lid],
+                        'connected_seconds': int(now - info['connected_at']),
+                        'active': info['active']
                     }
                     for lid, info in self.listeners.items()
                 ]
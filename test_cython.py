@@ -6,6 +6,7 @@ Run this after building to verify everything works
 
 import sys
 import time
+import threading
 
 def test_audio_buffer():
     """Test the Cython audio buffer"""
@@ -48,6 +49,31 @@ def test_audio_buffer():
         assert 0.45 < fill < 0.55, f"Fill percentage incorrect: {fill}"
         print(f"  ✓ Fill percentage: {fill*100:.1f}%")
         
+        # Test blocking write on a full buffer
+        buf.clear()
+        assert buf.write(b"F" * buf.space()), "Fill write failed"
+        assert not buf.write(b"Z" * 1024), "Write to a full buffer should fail"
+        result = []
+        writer = threading.Thread(target=lambda: result.append(buf.write(b"Z" * 1024, block=True)))
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive(), "Blocking write returned on a full buffer"
+        buf.read(4096)
+        writer.join(2.0)
+        assert not writer.is_alive() and result == [True], "Blocking write did not complete after a read"
+        print("  ✓ Blocking write waits for space")
+        
+        # Test wait_for_data
+        buf.clear()
+        start = time.monotonic()
+        assert not buf.wait_for_data(1, timeout=0.1), "wait_for_data should time out on an empty buffer"
+        assert time.monotonic() - start >= 0.09, "wait_for_data returned before its timeout"
+        feeder = threading.Timer(0.1, buf.write, args=(b"D" * 2048,))
+        feeder.start()
+        assert buf.wait_for_data(2048, timeout=2.0), "wait_for_data missed a write"
+        feeder.join()
+        print("  ✓ wait_for_data times out and wakes on write")
+        
         print("✓ audio_buffer tests PASSED\n")
         return True
         
@@ -76,9 +102,9 @@ def test_stream_broadcaster():
         # Test listener management
         class FakeSocket:
             def __init__(self):
-                self.data = b''
+                self.chunks = []
             def write(self, data):
-                self.data += data
+                self.chunks.append(data)
             def flush(self):
                 pass
         
@@ -135,6 +161,66 @@ def test_stream_broadcaster():
         return False
 
 
+def _load_kernels(use_numba):
+    """Import a fresh audio_kernels, with Numba hidden to get the pure-Python path"""
+    import importlib.util
+    
+    spec = importlib.util.find_spec('audio_kernels')
+    kernels = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get('numba')
+    if not use_numba:
+        sys.modules['numba'] = None
+    try:
+        spec.loader.exec_module(kernels)
+    finally:
+        if saved is None:
+            sys.modules.pop('numba', None)
+        else:
+            sys.modules['numba'] = saved
+    return kernels
+
+
+def test_icy_scanner():
+    """Test ICY title extraction across chunk boundaries"""
+    print("Testing audio_kernels ICY scanner...")
+    
+    try:
+        meta = b"\x00junk StreamTitle='Artist - Song';StreamUrl='';"
+        prefix = meta.index(b"StreamTitle='")
+        suffix = meta.index(b"';")
+        splits = {
+            "inside StreamTitle='": prefix + 6,
+            "inside the title": suffix - 4,
+            "inside ';": suffix + 1,
+        }
+        
+        for use_numba in (True, False):
+            kernels = _load_kernels(use_numba)
+            if kernels.HAVE_NUMBA != use_numba:
+                print("  - Numba not installed, skipped")
+                continue
+            label = "Numba" if use_numba else "pure Python"
+            
+            for where, cut in splits.items():
+                scanner = kernels.IcyTitleScanner()
+                first = bytearray(meta[:cut])
+                second = bytearray(meta[cut:])
+                assert scanner.feed(first, len(first)) is None, f"Title ended early ({where})"
+                title = scanner.feed(second, len(second))
+                assert title is not None, f"Title not found ({where})"
+                assert bytes(title) == b"Artist - Song", f"Title mismatch ({where}): {bytes(title)!r}"
+            print(f"  ✓ {label}: title found with splits {', '.join(splits)}")
+        
+        print("✓ ICY scanner tests PASSED\n")
+        return True
+        
+    except Exception as e:
+        print(f"✗ ICY scanner test FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def test_integration():
     """Test integration between modules"""
     print("Testing integration...")
@@ -151,9 +237,9 @@ def test_integration():
         class FakeListener:
             def __init__(self, name):
                 self.name = name
-                self.received = b''
+                self.chunks = []
             def write(self, data):
-                self.received += data
+                self.chunks.append(data)
             def flush(self):
                 pass
         
@@ -174,7 +260,7 @@ def test_integration():
         
         # Verify all listeners got data
         for listener in listeners:
-            assert len(listener.received) > 0, f"{listener.name} received no data"
+            assert sum(map(len, listener.chunks)) > 0, f"{listener.name} received no data"
         
         print(f"  ✓ All {len(listeners)} listeners received data")
         print("✓ Integration tests PASSED\n")
@@ -197,6 +283,7 @@ if __name__ == '__main__':
     
     results.append(("audio_buffer", test_audio_buffer()))
     results.append(("stream_broadcaster", test_stream_broadcaster()))
+    results.append(("icy_scanner", test_icy_scanner()))
     results.append(("integration", test_integration()))
     
     print("=" * 60)
@@ -6,6 +6,7 @@ Tests the TornadoStreamHandler without needing full server dependencies
 
 import sys
 import asyncio
+import collections
 import queue as Queue
 import threading
 import time
@@ -70,6 +71,64 @@ class MockRequest:
         self.headers = {}
 
 
+class StreamWriter:
+    """Deque-backed writer handed to the broadcaster, recycled between listeners
+    
+    The broadcaster thread is the only producer and the handler the only
+    consumer, so a bounded deque (append/popleft are atomic under the GIL)
+    needs no lock. write() wakes the handler's loop with
+    call_soon_threadsafe at most once per drain instead of once per chunk.
+    
+    Each listener gets its own deque and write(). The broadcaster keeps
+    the bound write() of a removed listener until its snapshot moves on,
+    so a stale call has to land in the old deque, not the reused writer's.
+    """
+    
+    def __init__(self, loop):
+        self.loop = loop
+        self.ready = asyncio.Event()
+        self.wake_pending = False
+        self.active = True
+        self._new_generation()
+    
+    def _new_generation(self):
+        """Start a fresh deque, with a write() that only feeds that deque"""
+        chunks = self.chunks = collections.deque(maxlen=500)
+        
+        def write(data):
+            if self.active and chunks is self.chunks:
+                # Append before checking the flag, the handler clears the flag
+                # before draining, so a chunk can never be left behind
+                chunks.append(data)
+                if not self.wake_pending:
+                    self.wake_pending = True
+                    self.loop.call_soon_threadsafe(self.ready.set)
+        
+        self.write = write
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.active = False
+    
+    def reset(self, loop):
+        """Drop anything left from the previous listener and reactivate"""
+        if loop is not self.loop:
+            # An asyncio.Event stays bound to the loop it was first used on
+            self.loop = loop
+            self.ready = asyncio.Event()
+        self.ready.clear()
+        self._new_generation()
+        self.wake_pending = False
+        self.active = True
+
+
+# Writers released by finished handlers, so a new listener doesn't have to
+# build a fresh queue on connect
+_WRITER_POOL = Queue.SimpleQueue()
+
+
 class MockTornadoStreamHandler:
     """Simulated TornadoStreamHandler for testing async behavior"""
     
@@ -78,6 +137,8 @@ class MockTornadoStreamHandler:
         self.request = MockRequest()
         self.written_data = []
         self.flushed_count = 0
+        # Set on the first write, so callers can await it instead of polling
+        self.data_written = asyncio.Event()
     
     def set_header(self, key, value):
         """Mock set_header"""
@@ -86,6 +147,7 @@ class MockTornadoStreamHandler:
     def write(self, data):
         """Mock write"""
         self.written_data.append(data)
+        self.data_written.set()
     
     async def flush(self):
         """Mock flush"""
@@ -100,55 +162,41 @@ class MockTornadoStreamHandler:
         # Set headers (mocked)
         self.set_header('Content-Type', 'audio/mpeg')
         
-        # Create queue-based writer
-        class StreamWriter:
-            def __init__(self):
-                self.queue = Queue.Queue(maxsize=500)
-                self.active = True
-            
-            def write(self, data):
-                if self.active:
-                    try:
-                        self.queue.put(data, block=False)
-                    except Queue.Full:
-                        pass
-            
-            def flush(self):
-                pass
-            
-            def close(self):
-                self.active = False
-        
-        writer = StreamWriter()
+        # Reuse a writer from an earlier listener if one is free
+        loop = asyncio.get_running_loop()
+        try:
+            writer = _WRITER_POOL.get_nowait()
+            writer.reset(loop)
+        except Queue.Empty:
+            writer = StreamWriter(loop)
         listener_id = self.stream_server.broadcaster.add_listener(writer)
         
         chunks_received = 0
         
         try:
-            # Stream data asynchronously (this is the key part)
-            loop = asyncio.get_event_loop()
-            
-            # Stream for a limited time in test
+            # Stream data asynchronously (this is the key part),
+            # for a limited time in test
             start_time = time.time()
             timeout = 2.0  # Test for 2 seconds
             
+            chunks = writer.chunks
             while time.time() - start_time < timeout:
                 try:
-                    # Get data from queue asynchronously
-                    data = await loop.run_in_executor(
-                        None,
-                        lambda: writer.queue.get(timeout=0.5)
-                    )
+                    # Woken once per batch of chunks, with no executor hop
+                    # or per-chunk callback
+                    try:
+                        await asyncio.wait_for(writer.ready.wait(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        # No data available, continue
+                        continue
+                    writer.ready.clear()
+                    writer.wake_pending = False
                     
-                    if data:
-                        self.write(data)
+                    while chunks:
+                        self.write(chunks.popleft())
                         await self.flush()
                         chunks_received += 1
                         
-                except Queue.Empty:
-                    # No data available, continue
-                    await asyncio.sleep(0.01)
-                    continue
                 except Exception as e:
                     logger.error(f"Streaming error: {e}")
                     break
@@ -158,6 +206,7 @@ class MockTornadoStreamHandler:
         finally:
             writer.close()
             self.stream_server.broadcaster.remove_listener(listener_id)
+            _WRITER_POOL.put(writer)
             logger.info(f"Listener cleanup complete (received {chunks_received} chunks)")
         
         return chunks_received
@@ -276,8 +325,10 @@ async def test_immediate_response():
     task = asyncio.create_task(handler.get())
     
     # Wait for first write
-    while len(handler.written_data) == 0 and time.time() - start_time < 2.0:
-        await asyncio.sleep(0.01)
+    try:
+        await asyncio.wait_for(handler.data_written.wait(), timeout=2.0)
+    except asyncio.TimeoutError:
+        pass
     
     first_data_time = time.time() - start_time
     
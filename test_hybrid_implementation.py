@@ -4,12 +4,109 @@ Comprehensive test suite for Cycast hybrid Flask/Tornado implementation
 Tests that the Tornado async handler fixes VLC startup delay
 """
 
+import os
+import collections
+import http.client
 import subprocess
 import time
 import sys
 import signal
 import requests
 import socket
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from diagnose import ThreadOutput
+
+# One keep-alive pool shared by every test instead of a connection per request
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=0))
+
+# Audio is never compressed, so don't let anything wrap the stream in gzip
+STREAM_HEADERS = {'Connection': 'keep-alive', 'Accept-Encoding': 'identity'}
+
+# Complete stream request for the raw-socket tests, sent in a single write
+REQ = b"GET /stream HTTP/1.1\r\nHost: localhost\r\nUser-Agent: cycast-test\r\nAccept: */*\r\n\r\n"
+
+
+def status_ok(host, port):
+    """Return True if /api/status answers 200 (plain http.client, no pool)"""
+    conn = http.client.HTTPConnection(host, port, timeout=0.5)
+    try:
+        conn.request('GET', '/api/status')
+        return conn.getresponse().status == 200
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def wait_ready(host, port, deadline):
+    """Poll until the server answers /api/status, returns False past deadline
+    
+    Backs off exponentially (5ms doubling up to 100ms) so a fast startup is
+    noticed within a few milliseconds without hammering a slow one. Only
+    once the port accepts connections is an HTTP request attempted.
+    """
+    delay = 0.005
+    while time.monotonic() < deadline:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(0.05)
+        try:
+            port_open = s.connect_ex((host, port)) == 0
+        finally:
+            s.close()
+        if port_open and status_ok(host, port):
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.1)
+    return False
+
+
+def start_server():
+    """Spawn cycast_server.py and wait until /api/status answers
+    
+    Returns (server, ready). Shared with test_ioloop_tickler.py so both
+    scripts start the server the same way. The server's output is drained
+    into server.output (the last 200 lines) so it never blocks on a full pipe.
+    """
+    server = subprocess.Popen(
+        ['python', 'cycast_server.py'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        # Own process group, so stop_server() can signal it as a whole
+        start_new_session=True
+    )
+    server.output = collections.deque(maxlen=200)
+    server.drain = threading.Thread(target=server.output.extend, args=(server.stdout,),
+                                    daemon=True)
+    server.drain.start()
+    
+    ready = wait_ready('localhost', 8001, time.monotonic() + 10)
+    return server, ready
+
+
+def stop_server(server):
+    """Stop the server's process group, SIGKILL if SIGTERM takes over a second"""
+    if server.poll() is not None:
+        return
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+def server_output(server):
+    """Return what an exited server printed last"""
+    server.drain.join(timeout=1)
+    return ''.join(server.output)
+
 
 def test_server_starts():
     """Test 1: Server starts successfully"""
@@ -20,41 +117,23 @@ def test_server_starts():
     try:
         # Start server
         print("Starting Cycast server...")
-        server = subprocess.Popen(
-            ['python', 'cycast_server.py'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
+        server, startup_success = start_server()
         
-        # Wait for startup and capture logs
         print("\nServer output:")
         print("-" * 70)
-        startup_success = False
-        for i in range(30):  # Wait up to 3 seconds
-            time.sleep(0.1)
-            if server.poll() is not None:
-                print("✗ Server exited prematurely!")
-                print(server.stdout.read())
-                return False, None
-            
-            # Check if server is responding
-            try:
-                response = requests.get('http://localhost:8001/api/status', timeout=0.5)
-                if response.status_code == 200:
-                    startup_success = True
-                    break
-            except:
-                pass
+        
+        if server.poll() is not None:
+            print("✗ Server exited prematurely!")
+            print(server_output(server))
+            return False, None
         
         if startup_success:
             print("✓ Server started successfully")
             print("-" * 70)
             return True, server
         else:
-            print("✗ Server failed to respond after 3 seconds")
-            server.terminate()
+            print("✗ Server failed to respond after 10 seconds")
+            stop_server(server)
             return False, None
             
     except Exception as e:
@@ -69,7 +148,7 @@ def test_status_page(server):
     print("=" * 70)
     
     try:
-        response = requests.get('http://localhost:8001/', timeout=5)
+        response = SESSION.get('http://localhost:8001/', timeout=5)
         
         if response.status_code == 200:
             if 'Cycast' in response.text and 'NOW PLAYING' in response.text:
@@ -98,7 +177,7 @@ def test_api_endpoints(server):
     
     # Test /api/status
     try:
-        response = requests.get('http://localhost:8001/api/status', timeout=5)
+        response = SESSION.get('http://localhost:8001/api/status', timeout=5)
         data = response.json()
         
         if 'listeners' in data and 'station_name' in data:
@@ -115,7 +194,7 @@ def test_api_endpoints(server):
     
     # Test /api/stats
     try:
-        response = requests.get('http://localhost:8001/api/stats', timeout=5)
+        response = SESSION.get('http://localhost:8001/api/stats', timeout=5)
         data = response.json()
         
         if 'buffer' in data and 'total_listeners' in data:
@@ -132,7 +211,37 @@ def test_api_endpoints(server):
     return all(results)
 
 
-def test_stream_connection_speed(server):
+def measure_first_byte():
+    """Connect to the stream once, returns seconds until the first byte"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # Send the GET immediately so the timing reflects the server only
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+        if hasattr(socket, 'TCP_QUICKACK'):
+            # Linux only: ACK the handshake immediately instead of delaying it
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        sock.settimeout(10)
+        
+        start = time.perf_counter_ns()
+        
+        sock.connect(('localhost', 8001))
+        
+        # Send HTTP GET
+        sock.sendall(REQ)
+        
+        # Wait for first byte, read into a buffer the way a player would
+        buf = bytearray(4096)
+        n = sock.recv_into(buf)
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        if not n:
+            raise ConnectionError("stream closed before sending any data")
+        return elapsed
+    finally:
+        sock.close()
+
+
+def test_stream_connection_speed(server, probes=10):
     """Test 4: Stream connects quickly (Tornado async handler)"""
     print("\n" + "=" * 70)
     print("TEST 4: Stream Connection Speed (Tornado Async)")
@@ -142,31 +251,23 @@ def test_stream_connection_speed(server):
     
     # Test with raw socket for precise timing
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(10)
+        print(f"Connecting to stream {probes} times...")
         
-        print("Connecting to stream...")
-        start_time = time.time()
+        # The first connection pays one-off warm-up costs, so leave it out
+        measure_first_byte()
+        samples = [measure_first_byte() for _ in range(probes)]
         
-        sock.connect(('localhost', 8001))
-        
-        # Send HTTP GET
-        request = b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n"
-        sock.sendall(request)
-        
-        # Wait for first byte
-        first_byte = sock.recv(1)
-        elapsed = time.time() - start_time
-        
-        sock.close()
+        # Inclusive keeps p95 within the observed samples, the default
+        # exclusive method extrapolates past the slowest of so few
+        q = statistics.quantiles(samples, n=20, method='inclusive')
+        p50, p95 = q[9], q[18]
+        print(f"Time to first byte: p50 {p50:.3f}s, p95 {p95:.3f}s")
         
-        print(f"Time to first byte: {elapsed:.3f} seconds")
-        
-        if elapsed < 2.0:
+        if p95 < 2.0:
             print("✓ EXCELLENT: Stream connected in < 2 seconds!")
             print("  This means VLC should work without Ctrl+C")
             return True
-        elif elapsed < 5.0:
+        elif p95 < 5.0:
             print("⚠ ACCEPTABLE: Stream connected in < 5 seconds")
             print("  VLC might still have slight delay")
             return True
@@ -192,47 +293,47 @@ def test_stream_data_flow(server):
     try:
         print("Streaming for 3 seconds...")
         
-        response = requests.get('http://localhost:8001/stream', stream=True, timeout=10)
-        
-        if response.status_code != 200:
-            print(f"✗ Stream returned {response.status_code}")
-            return False
-        
-        # Check headers
-        if response.headers.get('Content-Type') != 'audio/mpeg':
-            print(f"✗ Wrong content type: {response.headers.get('Content-Type')}")
-            return False
-        
-        print("✓ Headers correct (audio/mpeg)")
-        
-        # Collect data for 3 seconds
-        bytes_received = 0
-        start_time = time.time()
-        
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                bytes_received += len(chunk)
+        with SESSION.get('http://localhost:8001/stream', stream=True, timeout=10,
+                         headers=STREAM_HEADERS) as response:
+            if response.status_code != 200:
+                print(f"✗ Stream returned {response.status_code}")
+                return False
             
-            if time.time() - start_time > 3:
-                break
-        
-        elapsed = time.time() - start_time
-        
-        if bytes_received > 0:
-            rate = bytes_received / elapsed
-            print(f"✓ Received {bytes_received} bytes in {elapsed:.1f}s")
-            print(f"  Rate: {rate:.0f} bytes/sec ({rate*8/1000:.0f} kbps)")
+            # Check headers
+            if response.headers.get('Content-Type') != 'audio/mpeg':
+                print(f"✗ Wrong content type: {response.headers.get('Content-Type')}")
+                return False
             
-            # For 128kbps stream, expect ~16,000 bytes/sec
-            if rate > 10000:
-                print("✓ Data rate looks good")
-                return True
+            print("✓ Headers correct (audio/mpeg)")
+            
+            # Collect data for 3 seconds
+            bytes_received = 0
+            start = time.perf_counter_ns()
+            
+            for chunk in response.iter_content(chunk_size=65536):
+                if chunk:
+                    bytes_received += len(chunk)
+                
+                if time.perf_counter_ns() - start > 3_000_000_000:
+                    break
+            
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+            
+            if bytes_received > 0:
+                rate = bytes_received / elapsed
+                print(f"✓ Received {bytes_received} bytes in {elapsed:.1f}s")
+                print(f"  Rate: {rate:.0f} bytes/sec ({rate*8/1000:.0f} kbps)")
+                
+                # For 128kbps stream, expect ~16,000 bytes/sec
+                if rate > 10000:
+                    print("✓ Data rate looks good")
+                    return True
+                else:
+                    print("⚠ Data rate seems low")
+                    return True  # Still pass, might be low bitrate test file
             else:
-                print("⚠ Data rate seems low")
-                return True  # Still pass, might be low bitrate test file
-        else:
-            print("✗ No data received")
-            return False
+                print("✗ No data received")
+                return False
             
     except Exception as e:
         print(f"✗ Stream error: {e}")
@@ -245,39 +346,56 @@ def test_multiple_concurrent_listeners(server):
     print("TEST 6: Concurrent Listeners")
     print("=" * 70)
     
-    import threading
+    import asyncio
     
     results = {'success': 0, 'failed': 0}
     
-    def connect_listener(listener_id):
+    async def connect_listener(listener_id, gate):
+        """Open a raw stream connection, returns True once audio arrives"""
+        # Every listener connects at the same instant to exercise the accept path.
+        # The last to arrive opens the gate (asyncio.Barrier needs 3.11).
+        gate['waiting'] -= 1
+        if not gate['waiting']:
+            gate['open'].set()
+        await gate['open'].wait()
+        reader, writer = await asyncio.open_connection('localhost', 8001)
         try:
-            response = requests.get('http://localhost:8001/stream', 
-                                   stream=True, timeout=5)
+            writer.write(REQ)
+            await writer.drain()
             
-            # Get some data
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    results['success'] += 1
-                    break
-        except Exception as e:
-            results['failed'] += 1
+            headers = await reader.readuntil(b"\r\n\r\n")
+            if not headers.startswith(b"HTTP/1.1 200"):
+                return False
+            
+            # Body is chunked: size line first, then the audio itself.
+            # One byte proves delivery, there's no need to buffer more.
+            size = int((await reader.readline()).split(b";")[0], 16)
+            return size > 0 and len(await reader.readexactly(1)) == 1
+        finally:
+            # Hang up right away so the server drops this listener
+            writer.close()
+            await writer.wait_closed()
     
-    # Start 5 concurrent listeners
-    threads = []
-    for i in range(5):
-        t = threading.Thread(target=connect_listener, args=(i,))
-        t.daemon = True
-        t.start()
-        threads.append(t)
-        time.sleep(0.1)  # Stagger connections slightly
+    async def connect_all(count):
+        # One event loop multiplexes every listener
+        gate = {'waiting': count, 'open': asyncio.Event()}
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(connect_listener(i, gate), timeout=5) for i in range(count)),
+            return_exceptions=True
+        )
+        for outcome in outcomes:
+            if outcome is True:
+                results['success'] += 1
+            else:
+                results['failed'] += 1
     
-    # Wait for threads
-    for t in threads:
-        t.join(timeout=10)
+    # More simultaneous connects than a small listen backlog would hold
+    listener_count = 16
+    asyncio.run(connect_all(listener_count))
     
     print(f"Results: {results['success']} succeeded, {results['failed']} failed")
     
-    if results['success'] >= 3:
+    if results['success'] >= listener_count * 3 // 5:
         print("✓ Multiple listeners work")
         return True
     else:
@@ -298,20 +416,29 @@ def test_tornado_handler_used(server):
         import socket
         
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
         sock.settimeout(5)
         sock.connect(('localhost', 8001))
         
         # Send request
-        request = b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n"
-        sock.sendall(request)
-        
-        # Read response headers
-        response = b""
-        while b"\r\n\r\n" not in response:
-            chunk = sock.recv(1024)
-            if not chunk:
+        sock.sendall(REQ)
+        
+        # Read response headers into one preallocated buffer
+        buf = bytearray(8192)
+        view = memoryview(buf)
+        n = 0
+        while n < len(buf):
+            got = sock.recv_into(view[n:])
+            if not got:
+                break
+            # Only the new bytes (plus a possibly split terminator) need searching
+            searched = max(0, n - 3)
+            n += got
+            if buf.find(b"\r\n\r\n", searched, n) >= 0:
                 break
-            response += chunk
+        response = bytes(view[:n])
+        view.release()
         
         sock.close()
         
@@ -361,30 +488,38 @@ def run_all_tests():
         # Give server a moment to stabilize
         time.sleep(1)
         
-        # Test 2: Status page
-        success = test_status_page(server)
-        test_results.append(("Status Page (Flask)", success))
-        
-        # Test 3: API endpoints
-        success = test_api_endpoints(server)
-        test_results.append(("API Endpoints (Flask)", success))
-        
-        # Test 4: Stream connection speed (KEY TEST)
+        # Test 4: Stream connection speed (KEY TEST), timed on a quiet server
         success = test_stream_connection_speed(server)
         test_results.append(("Stream Speed (Tornado)", success))
         
-        # Test 5: Stream data flow
-        success = test_stream_data_flow(server)
-        test_results.append(("Stream Data Flow", success))
-        
-        # Test 6: Concurrent listeners
+        # Tests 2, 3, 5 and 7 are independent probes, so run them together
+        parallel_tests = [
+            (test_status_page, "Status Page (Flask)"),
+            (test_api_endpoints, "API Endpoints (Flask)"),
+            (test_stream_data_flow, "Stream Data Flow"),
+            (test_tornado_handler_used, "Tornado Handler"),
+        ]
+        output = ThreadOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [
+                    executor.submit(output.capture, lambda fn=fn: fn(server))
+                    for fn, _ in parallel_tests
+                ]
+                
+                # Replay each test's output in the usual order, whichever finished first
+                for (_, name), future in zip(parallel_tests, futures):
+                    success, text = future.result()
+                    output.write(text)
+                    test_results.append((name, success))
+        finally:
+            sys.stdout = output.stream
+        
+        # Test 6: Concurrent listeners, kept serial since it loads the server
         success = test_multiple_concurrent_listeners(server)
         test_results.append(("Concurrent Listeners", success))
         
-        # Test 7: Tornado handler verification
-        success = test_tornado_handler_used(server)
-        test_results.append(("Tornado Handler", success))
-        
     except KeyboardInterrupt:
         print("\n\nTests interrupted by user")
         test_results.append(("Tests", False))
@@ -398,11 +533,7 @@ def run_all_tests():
         if server:
             print("\n" + "=" * 70)
             print("Shutting down server...")
-            server.terminate()
-            try:
-                server.wait(timeout=5)
-            except:
-                server.kill()
+            stop_server(server)
             print("Server stopped")
     
     # Print results
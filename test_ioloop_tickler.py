@@ -7,6 +7,9 @@ import subprocess
 import time
 import sys
 import signal
+import select
+
+from test_hybrid_implementation import REQ, start_server, stop_server, server_output
 
 def test_vlc_startup():
     """Test that VLC can start playback without manual intervention"""
@@ -18,21 +21,16 @@ def test_vlc_startup():
     
     # Start the server
     print("1. Starting Cycast server...")
-    server_process = subprocess.Popen(
-        ['python', 'cycast_server.py'],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-    
-    # Wait for server to start
     print("2. Waiting for server to initialize...")
-    time.sleep(3)
+    server_process, ready = start_server()
     
     # Check if server is running
-    if server_process.poll() is not None:
+    if not ready:
         print("✗ Server failed to start!")
-        print(server_process.stderr.read())
+        if server_process.poll() is None:
+            stop_server(server_process)
+        else:
+            print(server_output(server_process))
         return False
     
     print("✓ Server started (PID: {})".format(server_process.pid))
@@ -44,28 +42,28 @@ def test_vlc_startup():
     print("   If this hangs for more than 2 seconds, the tickler isn't working")
     print()
     
-    start_time = time.time()
+    start = time.perf_counter_ns()
     
     try:
-        # Try to get stream data
+        # Stream unbuffered to our pipe so the first byte shows up immediately
         curl_process = subprocess.Popen(
-            ['curl', '-m', '5', 'http://localhost:8001/stream', '-o', '/dev/null', '-w', '%{http_code}'],
+            ['curl', '-N', '-s', '-o', '-', '-m', '5', 'http://localhost:8001/stream'],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            bufsize=0
         )
         
-        # Wait for first response (should be immediate with tickler)
-        time.sleep(2)
-        
-        if curl_process.poll() is None:
-            # Still running - getting data
-            elapsed = time.time() - start_time
-            print(f"✓ Stream started after {elapsed:.2f} seconds")
-            
-            # Kill curl
+        try:
+            # Wait for the first byte rather than a fixed 2 second probe
+            ready, _, _ = select.select([curl_process.stdout], [], [], 5.0)
+            first_byte = curl_process.stdout.read(1) if ready else b''
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+        finally:
             curl_process.terminate()
             curl_process.wait()
+        
+        if first_byte:
+            print(f"✓ Stream started after {elapsed:.2f} seconds")
             
             if elapsed < 3.0:
                 print("✓ IOLoop tickler is working! (startup < 3 seconds)")
@@ -76,7 +74,7 @@ def test_vlc_startup():
                 success = False
         else:
             print("✗ Stream connection failed")
-            print(curl_process.stderr.read())
+            print(curl_process.stderr.read().decode('utf-8', errors='replace'))
             success = False
             
     except Exception as e:
@@ -87,8 +85,7 @@ def test_vlc_startup():
         # Cleanup
         print()
         print("4. Cleaning up...")
-        server_process.terminate()
-        server_process.wait()
+        stop_server(server_process)
         print("✓ Server stopped")
     
     print()
@@ -117,21 +114,26 @@ def quick_test():
     
     # Try to connect
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # Send the GET immediately so the timing reflects the server only
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
     sock.settimeout(5)
     
     try:
-        start = time.time()
+        start = time.perf_counter_ns()
         sock.connect(('localhost', 8001))
         
         # Send HTTP GET
-        request = b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n"
-        sock.sendall(request)
+        sock.sendall(REQ)
         
-        # Wait for first byte
-        data = sock.recv(1)
-        elapsed = time.time() - start
+        # Wait for first byte, read into a buffer the way a player would
+        buf = bytearray(4096)
+        n = sock.recv_into(buf)
+        elapsed = (time.perf_counter_ns() - start) / 1e9
         
-        if data:
+        if n:
             print(f"✓ Got first byte in {elapsed:.3f} seconds")
             if elapsed < 1.0:
                 print("✓ Excellent responsiveness!")